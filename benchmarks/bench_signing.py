@@ -0,0 +1,99 @@
+"""
+Benchmarks of URL building, signing and encoding.
+
+Each benchmark is run with 5, 50 and 500 query params and fails if a single
+call allocates more than its budget. Latency regressions are caught by
+comparing against a saved run, see the README.
+"""
+from __future__ import unicode_literals
+
+import pytest
+
+from benchmarks.conftest import PARAM_COUNTS, make_params
+from wordpress.helpers import StrUtils, UrlUtils
+
+pytest.importorskip('pytest_benchmark')
+
+ENDPOINT = 'products'
+
+# peak bytes allocated by a single call, per param count. Roughly twice what
+# was measured when they were introduced.
+ALLOCATION_BUDGETS = {
+    'generate_oauth_signature': {5: 6000, 50: 48000, 500: 480000},
+    'add_params_sign': {5: 12000, 50: 68000, 500: 640000},
+    'flatten_params': {5: 2000, 50: 14000, 500: 144000},
+    'basic_get_auth_url': {5: 6000, 50: 36000, 500: 350000},
+    'endpoint_url': {5: 3000, 50: 8500, 500: 80000},
+    'jsonencode': {5: 9000, 50: 68000, 500: 660000},
+    'api_get': {5: 27000, 50: 81000, 500: 740000},
+}
+
+
+def query_endpoint(count):
+    return UrlUtils.substitute_query(
+        ENDPOINT, UrlUtils.flatten_params(make_params(count)))
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_generate_oauth_signature(benchmark, check_allocation, api, count):
+    url = api.requester.endpoint_url(ENDPOINT)
+    params = make_params(count)
+    func = api.auth.generate_oauth_signature
+    check_allocation(
+        ALLOCATION_BUDGETS['generate_oauth_signature'][count],
+        func, 'GET', params, url)
+    benchmark(func, 'GET', params, url)
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_add_params_sign(benchmark, check_allocation, api, count):
+    url = api.requester.endpoint_url(query_endpoint(count))
+
+    def sign():
+        return api.auth.add_params_sign('GET', url, api.auth.get_params())
+
+    check_allocation(ALLOCATION_BUDGETS['add_params_sign'][count], sign)
+    benchmark(sign)
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_flatten_params(benchmark, check_allocation, count):
+    params = make_params(count)
+    func = UrlUtils.flatten_params
+    check_allocation(ALLOCATION_BUDGETS['flatten_params'][count], func, params)
+    benchmark(func, params)
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_basic_get_auth_url(benchmark, check_allocation, basic_api, count):
+    url = basic_api.requester.endpoint_url(query_endpoint(count))
+    func = basic_api.auth.get_auth_url
+    check_allocation(
+        ALLOCATION_BUDGETS['basic_get_auth_url'][count], func, url, 'GET')
+    benchmark(func, url, 'GET')
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_endpoint_url(benchmark, check_allocation, api, count):
+    endpoint = query_endpoint(count)
+    func = api.requester.endpoint_url
+    check_allocation(ALLOCATION_BUDGETS['endpoint_url'][count], func, endpoint)
+    benchmark(func, endpoint)
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_jsonencode(benchmark, check_allocation, count):
+    data = [
+        {'id': index, 'name': value, 'meta_data': [{'key': key}]}
+        for index, (key, value) in enumerate(make_params(count))
+    ]
+    func = StrUtils.jsonencode
+    check_allocation(ALLOCATION_BUDGETS['jsonencode'][count], func, data)
+    benchmark(func, data)
+
+
+@pytest.mark.parametrize('count', PARAM_COUNTS)
+def bench_api_get(benchmark, check_allocation, api, mock_transport, count):
+    endpoint = query_endpoint(count)
+    check_allocation(ALLOCATION_BUDGETS['api_get'][count], api.get, endpoint)
+    benchmark(api.get, endpoint)
@@ -0,0 +1,105 @@
+"""
+Fixtures shared by the benchmarks.
+
+Every benchmark runs offline: requests are answered by an httmock transport.
+"""
+from __future__ import unicode_literals
+
+import random
+import tracemalloc
+
+import pytest
+
+from httmock import HTTMock, all_requests
+from wordpress.api import API
+
+CONSUMER_KEY = "ck_681c2be361e415519dce4b65ee981682cda78bc6"
+CONSUMER_SECRET = "cs_b11f652c39a0afd3752fc7bb0c56d60d58da5877"
+
+PARAM_COUNTS = [5, 50, 500]
+
+
+def make_params(count, seed=0):
+    """
+    Synthetic query params, a mix of flat keys and nested filter[...] keys
+    like the ones sent to the legacy wc-api.
+    """
+    rand = random.Random(seed)
+    params = []
+    for index in range(count):
+        key = [
+            'param_%d',
+            'filter[key_%d]',
+            'filter[meta][%d][key]',
+        ][index % 3] % index
+        value = rand.choice([
+            '%d' % rand.randint(0, 10 ** 6),
+            'some value %d/&=' % index,
+            'éè %d' % index,
+        ])
+        params.append((key, value))
+    return params
+
+
+def measure_peak_allocation(func, *args, **kwargs):
+    """ Bytes allocated at the peak of a single call of func """
+    func(*args, **kwargs)
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+@pytest.fixture
+def check_allocation(benchmark):
+    """
+    Record the peak allocation of a call in the benchmark report and fail
+    if it exceeds the budget (in bytes).
+    """
+    def check(budget, func, *args, **kwargs):
+        peak = measure_peak_allocation(func, *args, **kwargs)
+        benchmark.extra_info['peak_alloc_bytes'] = peak
+        assert peak <= budget, \
+            "allocated %d bytes, budget is %d" % (peak, budget)
+    return check
+
+
+@pytest.fixture
+def api():
+    return API(
+        url="http://localhost:8888/wordpress/",
+        consumer_key=CONSUMER_KEY,
+        consumer_secret=CONSUMER_SECRET,
+        api='wp-json',
+        version='wc/v3',
+    )
+
+
+@pytest.fixture
+def basic_api():
+    return API(
+        url="https://localhost:8888/wordpress/",
+        consumer_key=CONSUMER_KEY,
+        consumer_secret=CONSUMER_SECRET,
+        api='wp-json',
+        version='wc/v3',
+        basic_auth=True,
+        query_string_auth=True,
+    )
+
+
+@pytest.fixture
+def mock_transport():
+    @all_requests
+    def woo_test_mock(*args, **kwargs):
+        """ URL Mock """
+        return {'status_code': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'content': b'[{"id": 1}]'}
+
+    with HTTMock(woo_test_mock):
+        yield
@@ -48,7 +48,14 @@ setup(
         "beautifulsoup4",
         'lxml',
         'six',
+        'futures; python_version < "3"',
     ],
+    extras_require={
+        'async': ['httpx'],
+        'http2': ['httpx[http2]'],
+        'json': ['orjson; python_version >= "3.6"'],
+        'tracing': ['opentelemetry-api; python_version >= "3.6"'],
+    },
     setup_requires=[
         'pytest-runner',
     ],
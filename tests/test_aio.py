@@ -0,0 +1,224 @@
+""" AsyncAPI Tests """
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from wordpress.auth import OAuth
+from wordpress.helpers import UrlUtils
+
+try:
+    import asyncio
+    import httpx
+    from wordpress.aio import AsyncAPI
+    from wordpress.api import API
+except (ImportError, SyntaxError):
+    httpx = None
+
+
+@unittest.skipIf(
+    httpx is None or sys.version_info < (3, 6), "AsyncAPI requires httpx")
+class AsyncAPITestcases(unittest.TestCase):
+    def setUp(self):
+        self.api_params = dict(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            version="wc/v3",
+        )
+        self.requests = []
+
+    def mock_api(self, handler):
+        api = AsyncAPI(**self.api_params)
+
+        def recording_handler(request):
+            self.requests.append(request)
+            return handler(request)
+
+        api.requester.async_session = httpx.AsyncClient(
+            transport=httpx.MockTransport(recording_handler))
+        return api
+
+    def run_async(self, coroutine):
+        return asyncio.new_event_loop().run_until_complete(coroutine)
+
+    def test_get(self):
+        api = self.mock_api(
+            lambda request: httpx.Response(200, json=[{'id': 1}]))
+
+        async def get():
+            async with api:
+                return await api.get('products')
+
+        response = self.run_async(get())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'id': 1}])
+        self.assertTrue(response.request.url.startswith(
+            'http://woo.test/wp-json/wc/v3/products?oauth_consumer_key'))
+
+    def test_post(self):
+        api = self.mock_api(
+            lambda request: httpx.Response(201, content=request.content))
+
+        async def post():
+            async with api:
+                return await api.post('products', {'name': 'widget'})
+
+        response = self.run_async(post())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'name': 'widget'})
+        self.assertEqual(
+            json.loads(self.requests[0].content), {'name': 'widget'})
+
+    def test_error_raises(self):
+        api = self.mock_api(lambda request: httpx.Response(
+            404, json={'code': 'rest_no_route', 'message': 'No route'}))
+
+        async def get():
+            async with api:
+                return await api.get('nope')
+
+        with self.assertRaises(UserWarning):
+            self.run_async(get())
+
+    def test_signs_like_api(self):
+        OAuth.force_nonce = 'c4f2920b0213c43f2e8d3d3333168ec4a22222d1'
+        OAuth.force_timestamp = 1481601370
+        try:
+            api = self.mock_api(lambda request: httpx.Response(200, json=[]))
+
+            async def get():
+                async with api:
+                    return await api.get('products?page=2')
+
+            async_url = self.run_async(get()).request.url
+            sync_kwargs = API(**self.api_params)._prepare_request(
+                'GET', 'products?page=2', None)
+        finally:
+            OAuth.force_nonce = None
+            OAuth.force_timestamp = None
+        self.assertEqual(async_url, sync_kwargs['url'])
+
+    def test_iter_items(self):
+        def handler(request):
+            page = int(UrlUtils.get_query_singular(str(request.url), 'page', 1))
+            return httpx.Response(
+                200, json=[{'id': page}], headers={'X-WP-TotalPages': '3'})
+
+        api = self.mock_api(handler)
+
+        async def collect():
+            async with api:
+                return [item async for item in api.iter_items('products')]
+
+        items = self.run_async(collect())
+        self.assertEqual([item['id'] for item in items], [1, 2, 3])
+
+    def test_upload_media(self):
+        with open('tests/data/test.jpg', 'rb') as test_file:
+            img_data = test_file.read()
+        api = self.mock_api(
+            lambda request: httpx.Response(201, json={'id': 7}))
+
+        async def upload():
+            async with api:
+                return await api.upload_media('tests/data/test.jpg')
+
+        response = self.run_async(upload())
+        self.assertEqual(response.status_code, 201)
+        request = self.requests[0]
+        self.assertEqual(request.content, img_data)
+        self.assertEqual(request.headers['Content-Type'], 'image/jpeg')
+        self.assertEqual(
+            request.headers['Content-Length'], str(len(img_data)))
+
+    def test_concurrent_gets_coalesced(self):
+        self.api_params['coalesce'] = True
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={'id': 1})
+
+        api = self.mock_api(handler)
+
+        async def get_all():
+            async with api:
+                return await asyncio.gather(
+                    *[api.get('orders/1') for _ in range(4)])
+
+        responses = self.run_async(get_all())
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(
+            [response.json() for response in responses], [{'id': 1}] * 4)
+        self.assertEqual(api.single_flight.in_flight(), 0)
+
+    def test_batch(self):
+        def handler(request):
+            payload = json.loads(request.content)
+            return httpx.Response(200, json=dict(
+                (action, [{'id': obj['id']} for obj in objects])
+                for action, objects in payload.items()
+            ))
+
+        api = self.mock_api(handler)
+
+        async def batch():
+            async with api:
+                return await api.batch(
+                    'products',
+                    update=[{'id': i} for i in range(5)],
+                    chunk_size=2, workers=2,
+                )
+
+        result = self.run_async(batch())
+        self.assertEqual(
+            [obj['id'] for obj in result['update']], list(range(5)))
+        self.assertEqual(len(self.requests), 3)
+        self.assertTrue(all(
+            request.url.path == '/wp-json/wc/v3/products/batch'
+            for request in self.requests
+        ))
+
+    def test_upload_media_many(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        paths = []
+        for name, content in [('a.jpg', b'a'), ('b.jpg', b'b'),
+                              ('c.jpg', b'a')]:
+            paths.append(os.path.join(directory, name))
+            with open(paths[-1], 'wb') as media_file:
+                media_file.write(content)
+        uploaded = {}
+
+        def handler(request):
+            if request.method == 'GET':
+                search = request.url.params['search']
+                return httpx.Response(200, json=[
+                    {'id': media_id, 'description': {'raw': marker}}
+                    for marker, media_id in uploaded.items()
+                    if marker == search
+                ])
+            marker = request.url.params['description']
+            uploaded[marker] = len(uploaded) + 10
+            return httpx.Response(201, json={'id': uploaded[marker]})
+
+        api = self.mock_api(handler)
+
+        async def upload():
+            async with api:
+                first = await api.upload_media_many(paths, workers=2)
+                second = await api.upload_media_many(paths, workers=2)
+                return first, second
+
+        first, second = self.run_async(upload())
+        self.assertEqual(list(first), paths)
+        self.assertEqual(first[paths[0]], first[paths[2]])
+        self.assertNotEqual(first[paths[0]], first[paths[1]])
+        self.assertEqual(second, first)
+        self.assertEqual(len(uploaded), 2)
+        self.assertEqual(
+            len([r for r in self.requests if r.method == 'POST']), 2)
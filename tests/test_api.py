@@ -1,6 +1,7 @@
 """ API Tests """
 from __future__ import unicode_literals
 
+import json
 import os
 import random
 import unittest
@@ -166,6 +167,143 @@ class WordpressTestCase(unittest.TestCase):
                      ['a1', 'a2', 'b[c]', 'b[a]', 'b[b]'])
 
 
+class PaginationTestCases(unittest.TestCase):
+    """Test cases for iterating over paginated collections."""
+
+    def setUp(self):
+        self.api = wordpress.API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            version="wc/v3",
+        )
+        self.requested_pages = []
+
+    def paginated_mock(self, total_pages=3, link=True, total_header=True):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            params = UrlUtils.get_query_dict_singular(request.url)
+            page = int(params.get('page', 1))
+            self.requested_pages.append(page)
+            headers = {'Content-Type': 'application/json'}
+            if total_header:
+                headers['X-WP-TotalPages'] = str(total_pages)
+            if link and page < total_pages:
+                headers['Link'] = (
+                    '<http://woo.test/wp-json/wc/v3/products?'
+                    'oauth_nonce=abc&per_page=%s&page=%d>; rel="next"'
+                ) % (params.get('per_page'), page + 1)
+            content = [
+                {'id': (page - 1) * 2 + offset} for offset in range(2)
+            ]
+            return {'status_code': 200,
+                    'headers': headers,
+                    'content': StrUtils.jsonencode(content)}
+        return woo_test_mock
+
+    def test_iter_items_follows_link(self):
+        with HTTMock(self.paginated_mock(total_header=False)):
+            items = list(self.api.iter_items('products', per_page=2))
+        self.assertEqual([item['id'] for item in items], list(range(6)))
+        self.assertEqual(self.requested_pages, [1, 2, 3])
+
+    def test_iter_items_total_pages(self):
+        with HTTMock(self.paginated_mock(link=False)):
+            items = list(self.api.iter_items(
+                'products', per_page=2, prefetch=False))
+        self.assertEqual([item['id'] for item in items], list(range(6)))
+        self.assertEqual(self.requested_pages, [1, 2, 3])
+
+    def test_iter_items_concurrent(self):
+        nonces = []
+
+        @all_requests
+        def nonce_mock(url, request):
+            """ URL Mock """
+            nonces.append(
+                UrlUtils.get_query_singular(request.url, 'oauth_nonce'))
+            return paginated_mock(url, request)
+
+        paginated_mock = self.paginated_mock(total_pages=7, link=False)
+        with HTTMock(nonce_mock):
+            items = list(self.api.iter_items(
+                'products', per_page=2, workers=3))
+        self.assertEqual([item['id'] for item in items], list(range(14)))
+        self.assertEqual(sorted(self.requested_pages), list(range(1, 8)))
+        self.assertEqual(len(set(nonces)), 7)
+
+    def test_iter_pages_single_page(self):
+        with HTTMock(self.paginated_mock(link=False, total_header=False)):
+            pages = list(self.api.iter_pages('products'))
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(
+            UrlUtils.get_query_singular(pages[0].request.url, 'per_page'),
+            '100'
+        )
+
+    def test_get_page_items_legacy(self):
+        self.assertEqual(
+            API.get_page_items({'products': [{'id': 1}]}),
+            [{'id': 1}]
+        )
+
+
+class BatchTestCases(unittest.TestCase):
+    """Test cases for the batch endpoint helper."""
+
+    def setUp(self):
+        self.api = wordpress.API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            version="wc/v3",
+        )
+        self.payloads = []
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            self.assertEqual(url.path, '/wp-json/wc/v3/products/batch')
+            payload = json.loads(request.body)
+            self.payloads.append(payload)
+            result = {}
+            for action, objects in payload.items():
+                result[action] = [
+                    {'id': obj} if action == 'delete' else obj
+                    for obj in objects
+                ]
+            return {'status_code': 200,
+                    'content': StrUtils.jsonencode(result)}
+        self.mock = woo_test_mock
+
+    def test_batch_chunks(self):
+        with HTTMock(self.mock):
+            result = self.api.batch(
+                'products',
+                create=[{'name': 'a'}, {'name': 'b'}],
+                update=[{'id': 1}, {'id': 2}, {'id': 3}],
+                delete=[4, 5],
+                chunk_size=3,
+            )
+        self.assertEqual(len(self.payloads), 3)
+        self.assertTrue(all(
+            sum(len(objects) for objects in payload.values()) <= 3
+            for payload in self.payloads
+        ))
+        self.assertEqual(result['create'], [{'name': 'a'}, {'name': 'b'}])
+        self.assertEqual(result['update'], [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(result['delete'], [{'id': 4}, {'id': 5}])
+
+    def test_batch_concurrent(self):
+        update = [{'id': i} for i in range(10)]
+        with HTTMock(self.mock):
+            result = self.api.batch(
+                'products/batch', update=update, chunk_size=2, workers=4)
+        self.assertEqual(len(self.payloads), 5)
+        self.assertEqual(result['update'], update)
+
+
 class WCApiTestCasesBase(unittest.TestCase):
     """ Base class for WC API Test cases """
 
@@ -320,6 +320,51 @@ class OAuthTestcases(unittest.TestCase):
         # self.assertEqual('page', signed_url_params[-1][0])
         self.assertIn('page', dict(signed_url_params))
 
+    def test_add_params_sign_matches_flatten(self):
+        """
+        The signed url should be the same as when the base string and query
+        string are both built with flatten_params.
+        """
+        rand = random.Random(1)
+        for url in [
+            'http://localhost:8888/wordpress/wc-api/v3/products',
+            'HTTPS://Woo.test:443/wp-json/wc/v3/orders?page=2&'
+            'filter%5Blimit%5D=5&oauth_signature=stale&a=%C3%A9',
+        ]:
+            for count in [0, 5, 50]:
+                params = [
+                    ('oauth_consumer_key', self.consumer_key),
+                    ('oauth_nonce', text_type(rand.random())),
+                ]
+                for index in range(count):
+                    key = rand.choice([
+                        'k%d', 'filter[k%d]', 'filter[meta][%d]', 'a'
+                    ])
+                    if '%d' in key:
+                        key = key % index
+                    params.append((key, rand.choice([
+                        text_type(index), 'v %d/&=' % index, '\u00e9'
+                    ])))
+
+                signed_url = self.wcapi.auth.add_params_sign(
+                    "GET", url, list(params))
+
+                expected_params = list(params) + parse_qsl(urlparse(url).query)
+                expected_params = UrlUtils.sorted_params(
+                    UrlUtils.unique_params(expected_params))
+                expected_params = [
+                    (key, value) for key, value in expected_params
+                    if key != 'oauth_signature'
+                ]
+                signature = self.wcapi.auth.generate_oauth_signature(
+                    "GET", expected_params, url)
+                expected_url = UrlUtils.substitute_query(
+                    url,
+                    UrlUtils.flatten_params(
+                        expected_params + [('oauth_signature', signature)])
+                )
+                self.assertEqual(signed_url, expected_url)
+
 
 class OAuth3LegTestcases(unittest.TestCase):
     def setUp(self):
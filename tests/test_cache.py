@@ -0,0 +1,239 @@
+""" Cache Tests """
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from httmock import HTTMock, all_requests
+from wordpress.api import API
+from wordpress.cache import (EntityCache, MemoryCache, ResponseCache,
+                             SQLiteCache)
+
+
+def make_entry(content):
+    return dict(
+        status_code=200,
+        headers=[('ETag', '"abc"')],
+        encoding='utf-8',
+        content=content,
+    )
+
+
+class ResponseCacheTestcases(unittest.TestCase):
+    def test_key_ignores_volatile_params(self):
+        self.assertEqual(
+            ResponseCache.get_key(
+                'http://woo.test/wp-json/wp/v2/posts?page=2&'
+                'oauth_consumer_key=ck&oauth_nonce=1&oauth_signature=a&'
+                'oauth_timestamp=1'
+            ),
+            ResponseCache.get_key(
+                'http://woo.test/wp-json/wp/v2/posts?oauth_nonce=2&'
+                'oauth_timestamp=2&oauth_signature=b&oauth_consumer_key=ck&'
+                'page=2'
+            ),
+        )
+        self.assertNotEqual(
+            ResponseCache.get_key('http://woo.test/posts?page=2'),
+            ResponseCache.get_key('http://woo.test/posts?page=3'),
+        )
+
+    def test_from_value(self):
+        self.assertIsNone(ResponseCache.from_value(None))
+        self.assertIsInstance(ResponseCache.from_value(True), MemoryCache)
+
+    def test_memory_lru_eviction(self):
+        cache = MemoryCache(max_size=10)
+        cache.set('a', make_entry(b'1234'))
+        cache.set('b', make_entry(b'1234'))
+        cache.get('a')
+        cache.set('c', make_entry(b'1234'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.size, 8)
+        cache.set('d', make_entry(b'12345678901'))
+        self.assertIsNone(cache.get('d'))
+
+
+class SQLiteCacheTestcases(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_roundtrip(self):
+        cache = SQLiteCache(self.path)
+        cache.set('a', make_entry(b'[1, 2]'))
+        entry = SQLiteCache(self.path).get('a')
+        self.assertEqual(entry['content'], b'[1, 2]')
+        self.assertEqual(entry['headers'], [['ETag', '"abc"']])
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+
+    def test_lru_eviction(self):
+        cache = SQLiteCache(self.path, max_size=10)
+        cache.set('a', make_entry(b'1234'))
+        cache.set('b', make_entry(b'1234'))
+        cache.get('a')
+        cache.set('c', make_entry(b'1234'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+
+class APICacheTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            cache=True,
+        )
+        self.conditional_headers = []
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            self.conditional_headers.append(
+                request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return {'status_code': 304, 'headers': {'ETag': '"v1"'}}
+            return {'status_code': 200,
+                    'headers': {'ETag': '"v1"'},
+                    'content': b'[{"id": 1}]'}
+        self.mock = woo_test_mock
+
+    def test_revalidates(self):
+        with HTTMock(self.mock):
+            first = self.api.get('posts')
+            second = self.api.get('posts')
+        self.assertEqual(self.conditional_headers, [None, '"v1"'])
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.from_cache)
+
+    def test_only_get_is_cached(self):
+        with HTTMock(self.mock):
+            self.api.get('posts')
+            self.api.delete('posts')
+            self.api.get('posts?page=2')
+        self.assertEqual(self.conditional_headers, [None, None, None])
+
+
+class EntityCacheTestcases(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = EntityCache(
+            ttl=10, max_entries=2, clock=lambda: self.now)
+
+    def test_parse_endpoint(self):
+        self.assertEqual(
+            EntityCache.parse_endpoint('/products/12/'), ('products', 12, []))
+        self.assertEqual(
+            EntityCache.parse_endpoint('products/1/variations/3?context=edit'),
+            ('products/1/variations', 3, [('context', 'edit')])
+        )
+        self.assertEqual(
+            EntityCache.parse_endpoint('products?page=2'),
+            ('products', None, [('page', '2')])
+        )
+
+    def test_ttl_and_lru(self):
+        self.cache.set('products', 1, b'1')
+        self.cache.set('products', 2, b'2')
+        self.assertEqual(self.cache.get('products', 1), b'1')
+        self.cache.set('customers', 1, b'3')
+        self.assertIsNone(self.cache.get('products', 2))
+        self.now = 11
+        self.assertIsNone(self.cache.get('products', 1))
+
+    def test_invalidate(self):
+        self.cache.set('products', 1, b'1')
+        self.cache.set('customers', 1, b'2')
+        self.cache.invalidate('products')
+        self.assertIsNone(self.cache.get('products', 1))
+        self.assertEqual(self.cache.get('customers', 1), b'2')
+
+
+class APIEntityCacheTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            entity_cache=True,
+        )
+        self.requests = []
+        self.products = {
+            1: {'id': 1, 'name': 'Hoodie'}, 2: {'id': 2, 'name': 'Cap'}}
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            self.requests.append((request.method, url.path))
+            item_id = url.path.rpartition('/')[2]
+            if item_id.isdigit():
+                content = self.products[int(item_id)]
+            elif item_id == 'batch':
+                content = {}
+            else:
+                content = list(self.products.values())
+            return {'status_code': 200,
+                    'content': json.dumps(content).encode('utf-8')}
+        self.mock = woo_test_mock
+
+    def test_collection_populates(self):
+        with HTTMock(self.mock):
+            self.api.get('products')
+            response = self.api.get('products/2')
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), {'id': 2, 'name': 'Cap'})
+        self.assertEqual(
+            response.url, 'http://woo.test/wp-json/wp/v2/products/2')
+
+        # callers modifying the object don't modify the cache
+        response.json()['name'] = 'Hat'
+        with HTTMock(self.mock):
+            self.assertEqual(self.api.get('products/2').json()['name'], 'Cap')
+
+    def test_single_item_cached(self):
+        with HTTMock(self.mock):
+            self.api.get('products/1')
+            self.api.get('products/1')
+            self.api.get('products/1?context=edit')
+        self.assertEqual(len(self.requests), 2)
+
+    def test_writes_invalidate(self):
+        with HTTMock(self.mock):
+            self.api.get('products')
+            self.api.put('products/1', {'name': 'Sweater'})
+            self.api.get('products/1')
+            self.api.get('products/2')
+            self.api.post('products/batch', {'update': []})
+            self.api.get('products/2')
+        self.assertEqual(
+            [method for method, _ in self.requests],
+            ['GET', 'PUT', 'GET', 'POST', 'GET']
+        )
+
+    def test_urls_share_keys(self):
+        url = 'http://woo.test/wp-json/wp/v2/products/1'
+        with HTTMock(self.mock):
+            self.api.get('products/1')
+            self.assertTrue(self.api.get(url).from_cache)
+            self.api.put(url, {'name': 'Sweater'})
+            self.api.get('products/1')
+        self.assertEqual(
+            [method for method, _ in self.requests], ['GET', 'PUT', 'GET'])
+
+    def test_partial_responses_not_cached(self):
+        with HTTMock(self.mock):
+            self.api.get('products?_fields=id')
+            self.api.get('products/1')
+        self.assertEqual(len(self.requests), 2)
@@ -0,0 +1,105 @@
+""" Coalescing Tests """
+from __future__ import unicode_literals
+
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from httmock import HTTMock, all_requests
+from wordpress import API
+from wordpress.coalesce import SingleFlight
+
+
+class SingleFlightTestcases(unittest.TestCase):
+    def test_concurrent_calls_coalesced(self):
+        group = SingleFlight(copy=list)
+        calls = []
+        release = threading.Event()
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return [len(calls)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(group.do, 'key', call)]
+            while not calls:
+                time.sleep(0.001)
+            futures += [
+                executor.submit(group.do, 'key', call) for _ in range(3)]
+            # let the followers join the flight
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1]] * 4)
+        # followers get copies
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(group.in_flight(), 0)
+
+        # calls made after the flight landed aren't coalesced
+        self.assertEqual(group.do('key', call), [2])
+
+    def test_exception_shared(self):
+        group = SingleFlight()
+
+        def call():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            group.do('key', call)
+        self.assertEqual(group.in_flight(), 0)
+
+
+class APICoalesceTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            coalesce=True,
+        )
+        self.urls = []
+        self.release = threading.Event()
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            self.urls.append(request.url)
+            self.release.wait(5)
+            return {'status_code': 200,
+                    'content': b'{"id": 1}'}
+        self.mock = woo_test_mock
+
+    def test_key_ignores_signing(self):
+        self.assertEqual(
+            self.api._get_flight_key('GET', 'orders/1?b=2&a=1'),
+            self.api._get_flight_key('GET', 'orders/1?a=1&b=2'),
+        )
+        self.assertNotEqual(
+            self.api._get_flight_key('GET', 'orders/1'),
+            self.api._get_flight_key(
+                'GET', 'orders/1', headers={'X-Test': '1'}),
+        )
+        self.assertIsNone(self.api._get_flight_key('PUT', 'orders/1'))
+        self.assertIsNone(
+            self.api._get_flight_key('GET', 'orders/1', stream=True))
+
+    def test_concurrent_gets_coalesced(self):
+        with HTTMock(self.mock):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(self.api.get, 'orders/1')
+                    for _ in range(4)
+                ]
+                while not self.urls:
+                    time.sleep(0.001)
+                time.sleep(0.05)
+                self.release.set()
+                responses = [future.result() for future in futures]
+        self.assertEqual(len(self.urls), 1)
+        self.assertEqual(
+            [response.json() for response in responses], [{'id': 1}] * 4)
+        responses[0].json()['id'] = 2
+        self.assertEqual(responses[1].json(), {'id': 1})
@@ -0,0 +1,146 @@
+""" Fake Server Tests """
+from __future__ import unicode_literals
+
+import unittest
+
+from requests.exceptions import ConnectionError
+from wordpress import API
+from wordpress.fake import FakeServer, FakeTransport
+from wordpress.helpers import UrlUtils
+from wordpress.retry import RetryPolicy
+from wordpress.sync import Sync
+
+
+class FakeServerTestcases(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer()
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            api="wp-json",
+            version="wc/v3",
+            transport=self.server.transport,
+        )
+
+    def test_transport(self):
+        self.assertIsInstance(self.api.requester, FakeTransport)
+        self.assertIs(self.api.requester.server, self.server)
+        transport = FakeTransport("http://other.test", server=self.server)
+        api = API(
+            url="http://woo.test", consumer_key="ck", consumer_secret="cs",
+            transport=transport
+        )
+        self.assertIs(api.requester, transport)
+
+    def test_crud(self):
+        response = self.api.post('products', {'name': 'Cap', 'sku': 'C1'})
+        self.assertEqual(response.status_code, 201)
+        product = response.json()
+        self.assertEqual(product, {'id': 1, 'name': 'Cap', 'sku': 'C1'})
+
+        response = self.api.put('products/1', {'price': '5'})
+        self.assertEqual(response.json()['price'], '5')
+        self.assertEqual(self.api.get('products/1').json()['name'], 'Cap')
+        self.assertEqual(
+            self.api.get('products?sku=C1').json()[0]['id'], 1)
+
+        self.api.delete('products/1')
+        with self.assertRaises(UserWarning) as context:
+            self.api.get('products/1')
+        self.assertIn('rest_post_invalid_id', str(context.exception))
+
+    def test_post_mortem_is_lazy(self):
+        calls = []
+        beautify_response = UrlUtils.beautify_response
+        self.addCleanup(
+            setattr, UrlUtils, 'beautify_response', beautify_response)
+        UrlUtils.beautify_response = classmethod(
+            lambda cls, response: calls.append(response) or 'beautified')
+        with self.assertRaises(UserWarning) as context:
+            self.api.get('products/404')
+        self.assertEqual(calls, [])
+        self.assertIn('RESPONSE:beautified', str(context.exception))
+        self.assertEqual(len(calls), 1)
+
+    def test_pagination(self):
+        self.server.add_items(
+            'products', [{'name': 'product %d' % i} for i in range(25)])
+        response = self.api.get('products?per_page=10&page=2')
+        self.assertEqual(response.headers['X-WP-Total'], '25')
+        self.assertEqual(response.headers['X-WP-TotalPages'], '3')
+        self.assertEqual(
+            sorted(response.links), ['next', 'prev'])
+        self.assertNotIn('oauth_signature', response.links['next']['url'])
+        self.assertEqual(
+            [product['id'] for product in response.json()],
+            list(range(11, 21))
+        )
+        self.assertEqual(
+            [product['id'] for product in self.api.iter_items(
+                'products', per_page=10)],
+            list(range(1, 26))
+        )
+        with self.assertRaises(UserWarning):
+            self.api.get('products?per_page=10&page=4')
+
+    def test_batch(self):
+        self.server.add_items('products', [{'name': 'a'}, {'name': 'b'}])
+        result = self.api.batch(
+            'products', create=[{'name': 'c'}],
+            update=[{'id': 1, 'name': 'A'}, {'id': 9, 'name': 'I'}],
+            delete=[2],
+        )
+        self.assertEqual(result['create'][0]['id'], 3)
+        self.assertEqual(result['update'][0]['name'], 'A')
+        self.assertEqual(
+            result['update'][1]['error']['code'], 'rest_post_invalid_id')
+        self.assertEqual(
+            [item['name'] for item in self.server.get_items('products')],
+            ['A', 'c']
+        )
+
+    def test_sync(self):
+        self.server.add_items('products', [
+            {'name': 'a', 'date_modified_gmt': '2020-01-01T00:00:00'},
+            {'name': 'b', 'date_modified_gmt': '2020-01-02T00:00:00'},
+        ])
+        sync = Sync(self.api)
+        self.assertEqual(len(sync.get_changes('products')), 2)
+        self.server.add_items('products', [
+            {'name': 'c', 'date_modified_gmt': '2020-01-03T00:00:00'},
+        ])
+        self.assertEqual(
+            [item['name'] for item in sync.get_changes('products')], ['c'])
+
+    def test_errors_are_deterministic(self):
+        def statuses(server):
+            api = API(
+                url="http://woo.test", consumer_key="ck", consumer_secret="cs",
+                transport=server.transport
+            )
+            server.add_items('posts', [{'title': 'a'}])
+            return [
+                api.get('posts', handle_status_codes=[503]).status_code
+                for _ in range(50)
+            ]
+
+        first = statuses(FakeServer(error_rate=0.3, seed=4))
+        self.assertEqual(first, statuses(FakeServer(error_rate=0.3, seed=4)))
+        self.assertIn(503, first)
+        self.assertIn(200, first)
+
+    def test_latency_and_connection_errors(self):
+        sleeps = []
+        server = FakeServer(
+            latency=(0.1, 0.2), connection_error_rate=1, sleep=sleeps.append)
+        api = API(
+            url="http://woo.test", consumer_key="ck", consumer_secret="cs",
+            transport=server.transport,
+            retries=RetryPolicy(total=2, backoff_factor=0),
+        )
+        with self.assertRaises(ConnectionError):
+            api.get('posts')
+        self.assertEqual(server.request_count, 3)
+        self.assertEqual(len(sleeps), 3)
+        self.assertTrue(all(0.1 <= latency <= 0.2 for latency in sleeps))
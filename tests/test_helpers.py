@@ -1,10 +1,14 @@
 """ API Tests """
 from __future__ import unicode_literals
 
+import json
+import pickle
 import unittest
 
+from requests import Response
 from six import text_type
-from wordpress.helpers import SeqUtils, StrUtils, UrlUtils
+from wordpress.helpers import (JsonUtils, LazyUserWarning, ResponseUtils,
+                               SeqUtils, StrUtils, UrlUtils)
 
 
 class HelperTestcase(unittest.TestCase):
@@ -186,3 +190,83 @@ class HelperTestcase(unittest.TestCase):
             'sdf',
             StrUtils.decapitate('sdf', '/')
         )
+
+    def test_response_get_json_invalid_cached(self):
+        response = Response()
+        response._content = b'<html></html>'
+        with self.assertRaises(ValueError):
+            ResponseUtils.get_json(response)
+        response._content = b'{}'
+        with self.assertRaises(ValueError):
+            ResponseUtils.get_json(response)
+
+    def test_json_iter_array(self):
+        items = [{'id': i, 'name': 'été', 'price': 1.5} for i in range(50)]
+        content = StrUtils.to_binary(json.dumps(items))
+        for size in [1, 3, 1000, len(content)]:
+            chunks = [
+                content[i:i + size] for i in range(0, len(content), size)
+            ]
+            self.assertEqual(list(JsonUtils.iter_array(chunks)), items)
+        self.assertEqual(list(JsonUtils.iter_array([b' [ ] '])), [])
+        self.assertEqual(list(JsonUtils.iter_array([b'[12', b'34]'])), [1234])
+
+    def test_json_iter_array_invalid(self):
+        for content in [b'', b'{}', b'[1,', b'[1 2]', b'[1] 2', b'[{"a": ']:
+            with self.assertRaises(ValueError):
+                list(JsonUtils.iter_array([content]))
+
+    def test_response_project_fields(self):
+        data = [
+            {'id': 1, 'title': {'rendered': 'a'}, 'meta': {'a': 1, 'b': 2}},
+            {'id': 2, 'content': 'b'},
+        ]
+        self.assertEqual(
+            ResponseUtils.project_fields(data, ['id', 'meta.b', 'title']),
+            [
+                {'id': 1, 'title': {'rendered': 'a'}, 'meta': {'b': 2}},
+                {'id': 2},
+            ]
+        )
+        self.assertEqual(ResponseUtils.project_fields('-1', ['id']), '-1')
+
+    def test_url_beautify_response_bounded(self):
+        response = Response()
+        response.headers['Content-Type'] = 'text/plain'
+        response._content = b'x' * 100
+        self.assertEqual(
+            UrlUtils.beautify_response(response, limit=10),
+            'x' * 10 + '\n... (90 more bytes)'
+        )
+        response.headers['Content-Type'] = 'text/html; charset=UTF-8'
+        response._content = b'<html><body><p>' + b'\xc3\xa9' * 10000
+        beautified = UrlUtils.beautify_response(response, limit=100)
+        self.assertIn(b'<p>', beautified)
+        self.assertIn(b'more bytes', beautified)
+        self.assertLess(len(beautified), 1000)
+
+    def test_lazy_user_warning(self):
+        calls = []
+
+        def get_message():
+            calls.append(1)
+            return 'message'
+
+        warning = LazyUserWarning(get_message)
+        self.assertIsInstance(warning, UserWarning)
+        self.assertEqual(calls, [])
+        self.assertEqual(str(warning), 'message')
+        self.assertEqual(str(warning), 'message')
+        self.assertEqual(calls, [1])
+        self.assertEqual(warning.args, ('message',))
+        self.assertEqual(calls, [1])
+
+        try:
+            raise LazyUserWarning(get_message)
+        except UserWarning as exc:
+            self.assertEqual(exc.args[0], 'message')
+
+        unpickled = pickle.loads(pickle.dumps(warning))
+        self.assertIsInstance(unpickled, LazyUserWarning)
+        self.assertEqual(unpickled.args, ('message',))
+        self.assertEqual(str(unpickled), 'message')
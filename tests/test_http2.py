@@ -0,0 +1,133 @@
+""" HTTP/2 Transport Tests """
+from __future__ import unicode_literals
+
+import json
+import socket
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import ConnectionError
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    from wordpress.api import API
+    from wordpress.http2 import HTTP2Transport
+except (ImportError, SyntaxError):
+    h2 = None
+
+
+class H2Server(object):
+    """
+    Local HTTP/2 server without TLS (h2c) which holds the responses until
+    `batch` requests are pending on a connection, or for `wait` seconds.
+    """
+
+    def __init__(self, batch, wait=0.5):
+        self.batch = batch
+        self.wait = wait
+        self.connections = 0
+        self.max_pending = 0
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+        thread = threading.Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            thread = threading.Thread(target=self.serve, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def respond(self, connection, pending):
+        for stream_id, headers in pending:
+            body = json.dumps({
+                'path': headers[b':path'].decode('utf-8').split('?')[0]
+            }).encode('utf-8')
+            connection.send_headers(stream_id, [
+                (':status', '200'),
+                ('content-type', 'application/json'),
+                ('content-length', str(len(body))),
+            ])
+            connection.send_data(stream_id, body, end_stream=True)
+        del pending[:]
+
+    def serve(self, conn):
+        connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        conn.sendall(connection.data_to_send())
+        conn.settimeout(self.wait)
+        headers, pending = {}, []
+        while True:
+            try:
+                data = conn.recv(65535)
+            except socket.timeout:
+                self.respond(connection, pending)
+                conn.sendall(connection.data_to_send())
+                continue
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    headers[event.stream_id] = dict(event.headers)
+                elif isinstance(event, h2.events.StreamEnded):
+                    pending.append(
+                        (event.stream_id, headers.pop(event.stream_id)))
+            self.max_pending = max(self.max_pending, len(pending))
+            if len(pending) >= self.batch:
+                self.respond(connection, pending)
+            conn.sendall(connection.data_to_send())
+        conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+@unittest.skipIf(
+    h2 is None or sys.version_info < (3, 6), "HTTP/2 requires httpx and h2")
+class HTTP2TransportTestcases(unittest.TestCase):
+    def setUp(self):
+        self.server = H2Server(batch=16)
+        self.addCleanup(self.server.close)
+        self.api = API(
+            url="http://127.0.0.1:%d" % self.server.port,
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            transport=HTTP2Transport,
+            http1=False,
+        )
+        self.addCleanup(self.api.requester.close)
+
+    def test_multiplexed(self):
+        with ThreadPoolExecutor(16) as executor:
+            responses = list(executor.map(
+                lambda post_id: self.api.get('posts/%d' % post_id),
+                range(32)
+            ))
+        self.assertEqual(
+            [response.json()['path'] for response in responses],
+            ['/wp-json/wp/v2/posts/%d' % post_id for post_id in range(32)]
+        )
+        self.assertEqual(self.server.connections, 1)
+        self.assertGreater(self.server.max_pending, 1)
+
+    def test_connection_error(self):
+        self.server.close()
+        api = API(
+            url="http://127.0.0.1:1", consumer_key="ck", consumer_secret="cs",
+            transport=HTTP2Transport, http1=False,
+        )
+        with self.assertRaises(ConnectionError):
+            api.get('posts')
@@ -0,0 +1,117 @@
+""" Metrics Tests """
+from __future__ import unicode_literals
+
+import unittest
+
+from httmock import HTTMock, all_requests
+from requests.exceptions import ConnectionError
+from wordpress import API
+from wordpress.metrics import MetricsAggregator, RequestEvent
+from wordpress.retry import RetryPolicy
+
+
+class RequestEventTestcases(unittest.TestCase):
+    def test_template(self):
+        self.assertEqual(
+            RequestEvent.get_template('/products/12/variations/3?page=2'),
+            'products/{id}/variations/{id}'
+        )
+        self.assertEqual(RequestEvent.get_template('products'), 'products')
+
+
+class AggregatorTestcases(unittest.TestCase):
+    def test_percentiles(self):
+        aggregator = MetricsAggregator()
+        for duration in range(1, 101):
+            event = RequestEvent('GET', 'products/%d' % duration)
+            event.status_code = 200 if duration % 10 else 500
+            event.duration = duration / 1000.0
+            event.bytes_in = 10
+            aggregator.record(event)
+        summary = aggregator.summary()['GET products/{id}']
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['errors'], 10)
+        self.assertEqual(summary['bytes_in'], 1000)
+        self.assertEqual(summary['statuses'], {200: 90, 500: 10})
+        self.assertEqual(
+            [summary['p50'], summary['p95'], summary['p99']],
+            [0.05, 0.095, 0.099]
+        )
+
+
+class APIHooksTestcases(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            hooks={
+                'on_request_start': lambda event: self.events.append(
+                    ('on_request_start', event)),
+                'on_response': lambda event: self.events.append(
+                    ('on_response', event)),
+            }
+        )
+        for name in ['on_retry', 'on_error', 'on_decode']:
+            self.api.requester.add_hook(
+                name, lambda event, name=name: self.events.append(
+                    (name, event)))
+
+    def test_unknown_hook(self):
+        with self.assertRaises(UserWarning):
+            self.api.requester.add_hook('on_whatever', print)
+
+    def test_no_hooks_no_events(self):
+        api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+        )
+        self.assertIsNone(api.requester.start_event('GET', 'products'))
+
+    def test_events(self):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            return {'status_code': 200, 'content': b'[{"id": 1}]'}
+
+        with HTTMock(woo_test_mock):
+            response = self.api.post('products/12', {'name': 'Cap'})
+            response.json()
+            response.json()
+        self.assertEqual(
+            [name for name, _ in self.events],
+            ['on_request_start', 'on_response', 'on_decode']
+        )
+        event = self.events[-1][1]
+        self.assertEqual(event.method, 'POST')
+        self.assertEqual(event.template, 'products/{id}')
+        self.assertEqual(event.status_code, 200)
+        self.assertEqual(event.bytes_out, len(b'{"name": "Cap"}'))
+        self.assertEqual(event.bytes_in, len(b'[{"id": 1}]'))
+        self.assertEqual(
+            list(event.timings),
+            ['url_build', 'sign', 'encode', 'ttfb', 'download', 'json_decode']
+        )
+        self.assertTrue(event.duration >= 0)
+        self.assertTrue(event.url.startswith('http://woo.test/wp-json'))
+
+    def test_retry_and_error_events(self):
+        self.api.retry = RetryPolicy(total=1, backoff_factor=0)
+        aggregator = MetricsAggregator().attach(self.api)
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            raise ConnectionError('refused')
+
+        with HTTMock(woo_test_mock):
+            with self.assertRaises(ConnectionError):
+                self.api.get('products')
+        self.assertEqual(
+            [(name, event.attempt) for name, event in self.events],
+            [('on_request_start', 0), ('on_error', 0), ('on_retry', 0),
+             ('on_request_start', 1), ('on_error', 1)]
+        )
+        self.assertEqual(aggregator.summary()['GET products']['errors'], 2)
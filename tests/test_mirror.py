@@ -0,0 +1,91 @@
+""" Mirror Tests """
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from httmock import HTTMock, all_requests
+from six.moves.urllib.parse import parse_qsl
+from wordpress import API
+from wordpress.mirror import Mirror
+
+
+class MirrorTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            version='wc/v3',
+        )
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.products = [
+            {'id': 1, 'slug': 'hoodie', 'sku': 'H-1',
+             'date_modified_gmt': '2020-01-01T10:00:00'},
+            {'id': 2, 'slug': 'cap', 'sku': '',
+             'date_modified_gmt': '2020-01-02T10:00:00'},
+        ]
+        self.requests = 0
+
+    @property
+    def products_mock(self):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ Products endpoint filtering on modified_after """
+            self.requests += 1
+            query = dict(parse_qsl(url.query))
+            products = [
+                product for product in self.products
+                if product['date_modified_gmt'] > query.get(
+                    'modified_after', '')
+            ]
+            return {
+                'status_code': 200,
+                'headers': {'X-WP-TotalPages': '1'},
+                'content': json.dumps(products).encode('utf-8'),
+            }
+        return woo_test_mock
+
+    def test_lookups(self):
+        mirror = Mirror(self.api)
+        with HTTMock(self.products_mock):
+            self.assertEqual(mirror.refresh('products'), 2)
+        self.assertEqual(mirror.count('products'), 2)
+        self.assertEqual(mirror.get('products', 2), self.products[1])
+        self.assertIsNone(mirror.get('products', 3))
+        self.assertEqual(mirror.get_by_sku('products', 'H-1')['id'], 1)
+        self.assertEqual(mirror.get_by_slug('products', 'cap')['id'], 2)
+        self.assertEqual(
+            [item['id'] for item in mirror.find(
+                'products', modified_after='2020-01-01T10:00:00')],
+            [2]
+        )
+        self.assertEqual(mirror.all('posts'), [])
+        with self.assertRaises(UserWarning):
+            mirror.find('products', name='Hoodie')
+
+    def test_refresh_and_rebuild(self):
+        path = os.path.join(self.tmp_dir, 'mirror.sqlite')
+        mirror = Mirror(self.api, path)
+        with HTTMock(self.products_mock):
+            mirror.refresh('products')
+        mirror.close()
+
+        self.products[0]['sku'] = 'H-2'
+        self.products[0]['date_modified_gmt'] = '2020-01-03T10:00:00'
+        del self.products[1]
+        mirror = Mirror(self.api, path)
+        with HTTMock(self.products_mock):
+            self.assertEqual(mirror.refresh('products'), 1)
+        self.assertIsNone(mirror.get_by_sku('products', 'H-1'))
+        self.assertEqual(mirror.get_by_sku('products', 'H-2')['id'], 1)
+        self.assertEqual(mirror.count('products'), 2)
+
+        with HTTMock(self.products_mock):
+            self.assertEqual(mirror.rebuild('products'), 1)
+        self.assertEqual(mirror.count('products'), 1)
+        mirror.close()
@@ -0,0 +1,120 @@
+""" Rate Limiting Tests """
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+from httmock import HTTMock, all_requests
+from wordpress.api import API
+from wordpress.helpers import UrlUtils
+from wordpress.ratelimit import TokenBucket
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTestcases(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_burst(self):
+        bucket = TokenBucket(2, burst=3, clock=self.clock)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+
+    def test_refill(self):
+        bucket = TokenBucket(2, burst=2, clock=self.clock)
+        bucket.reserve()
+        bucket.reserve()
+        self.clock.now += 0.5
+        self.assertEqual(bucket.reserve(), 0)
+        self.clock.now += 10
+        self.assertEqual([bucket.reserve() for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+    def test_from_value(self):
+        self.assertIsNone(TokenBucket.from_value(None))
+        bucket = TokenBucket.from_value(5, 10)
+        self.assertEqual((bucket.rate, bucket.burst), (5, 10))
+        self.assertIs(TokenBucket.from_value(bucket), bucket)
+        with self.assertRaises(UserWarning):
+            TokenBucket(0)
+
+    def test_threads_share_bucket(self):
+        bucket = TokenBucket(10, burst=1, clock=self.clock)
+        waits = []
+
+        def reserve():
+            waits.append(bucket.reserve())
+
+        threads = [threading.Thread(target=reserve) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(round(wait, 6) for wait in waits),
+            [0, 0.1, 0.2, 0.3, 0.4]
+        )
+
+
+class RecordingBucket(TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super(RecordingBucket, self).__init__(*args, **kwargs)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class APIRateLimitTestcases(unittest.TestCase):
+    def test_requests_are_paced(self):
+        bucket = RecordingBucket(1, burst=2, clock=FakeClock())
+        api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            rate_limit=bucket,
+        )
+
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock """
+            return {'status_code': 200, 'content': b'[]'}
+
+        with HTTMock(woo_test_mock):
+            for _ in range(4):
+                api.get('posts')
+        self.assertEqual(len(bucket.sleeps), 2)
+
+    def test_requests_signed_after_wait(self):
+        clock = FakeClock()
+        bucket = RecordingBucket(1, burst=1, clock=clock)
+        bucket.sleep = lambda seconds: setattr(
+            clock, 'now', clock.now + seconds)
+        api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            rate_limit=bucket,
+        )
+        api.auth.generate_timestamp = lambda: int(clock.now)
+        timestamps = []
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            timestamps.append(int(UrlUtils.get_query_singular(
+                request.url, 'oauth_timestamp')))
+            return {'status_code': 200, 'content': b'[]'}
+
+        with HTTMock(woo_test_mock):
+            for _ in range(3):
+                api.get('posts')
+        self.assertEqual(timestamps, [1000, 1001, 1002])
@@ -0,0 +1,179 @@
+""" API Tests """
+from __future__ import unicode_literals
+
+import json
+import logging
+import unittest
+from io import BytesIO
+
+from httmock import HTTMock, all_requests
+from requests import Response
+from wordpress import API
+from wordpress.helpers import JsonUtils
+from wordpress.response import APIResponse
+from wordpress.transport import API_Requests_Wrapper
+
+
+class ResponseTestcases(unittest.TestCase):
+    def make_response(self, content, encoding='utf-8'):
+        response = Response()
+        response.status_code = 200
+        response.encoding = encoding
+        response._content = content
+        return response
+
+    def test_from_response(self):
+        response = self.make_response(b'{"id": 1}')
+        response.url = 'https://woo.test:8888/wp-json/wp/v2/posts/1'
+        wrapped = APIResponse.from_response(response)
+        self.assertIsInstance(wrapped, Response)
+        self.assertEqual(wrapped.url, response.url)
+        self.assertEqual(wrapped.json(), {'id': 1})
+        self.assertIs(APIResponse.from_response(wrapped), wrapped)
+
+    def test_json_decoded_once(self):
+        response = APIResponse.from_response(
+            self.make_response(b'[{"id": 1}, {"id": 2}]'))
+        decoded = response.json()
+        self.assertIs(response.json(), decoded)
+
+    def test_json_kwargs_not_memoized(self):
+        response = APIResponse.from_response(
+            self.make_response(b'{"price": 1.5}'))
+        self.assertEqual(
+            response.json(parse_float=str), {'price': '1.5'})
+        self.assertEqual(response.json(), {'price': 1.5})
+
+    def test_json_other_encoding(self):
+        content = json.dumps({'name': 'été'}).encode('utf-16')
+        response = APIResponse.from_response(
+            self.make_response(content, None))
+        self.assertEqual(response.json(), {'name': 'été'})
+        content = '{"name": "été"}'.encode('latin-1')
+        response = APIResponse.from_response(
+            self.make_response(content, 'ISO-8859-1'))
+        self.assertEqual(response.json(), {'name': 'été'})
+
+    def test_json_invalid(self):
+        response = APIResponse.from_response(
+            self.make_response(b'<html></html>'))
+        with self.assertRaises(ValueError):
+            response.json()
+        with self.assertRaises(ValueError):
+            response.json()
+
+    def test_json_backend(self):
+        self.assertEqual(JsonUtils.loads(b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(JsonUtils.loads('{"a": null}'), {'a': None})
+
+    def test_api_returns_api_response(self):
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock """
+            return {'status_code': 200,
+                    'content': b'[{"id": 1}]'}
+
+        api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+        )
+        with HTTMock(woo_test_mock):
+            response = api.get('posts')
+        self.assertIsInstance(response, APIResponse)
+        self.assertEqual(response.json(), [{'id': 1}])
+
+    def test_iter_json_streamed(self):
+        items = [{'id': i} for i in range(100)]
+        response = APIResponse()
+        response.status_code = 200
+        response.raw = BytesIO(json.dumps(items).encode('utf-8'))
+        self.assertEqual(list(response.iter_json(chunk_size=16)), items)
+
+    def test_streamed_response_not_read_by_debug_log(self):
+        requester = API_Requests_Wrapper(url='https://woo.test:8888/')
+        requester.logger.setLevel(logging.DEBUG)
+        self.addCleanup(requester.logger.setLevel, logging.NOTSET)
+        response = APIResponse()
+        response.status_code = 200
+        response.raw = BytesIO(b'[{"id": 1}]')
+        requester.log_response(response)
+        self.assertIs(response._content, False)
+        self.assertEqual(list(response.iter_json()), [{'id': 1}])
+
+    def test_api_get_stream(self):
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock """
+            return {'status_code': 200,
+                    'content': b'[{"id": 1}, {"id": 2}]'}
+
+        api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+        )
+        with HTTMock(woo_test_mock):
+            response = api.get('posts', stream=True)
+            self.assertEqual(
+                [item['id'] for item in response.iter_json()], [1, 2])
+
+    def test_api_get_fields(self):
+        urls = []
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock ignoring _fields, like old servers """
+            urls.append(request.url)
+            return {'status_code': 200,
+                    'content': json.dumps([
+                        {'id': 1, 'modified': '2020', 'content': 'long',
+                         '_links': {}},
+                    ]).encode('utf-8')}
+
+        api = API(
+            url='http://woo.test/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+        )
+        with HTTMock(woo_test_mock):
+            response = api.get('posts', fields=['id', 'modified'])
+            self.assertEqual(response.json(), [{'id': 1, 'modified': '2020'}])
+            response = api.get('posts', fields='id', embed=True)
+            self.assertEqual(response.json(), [{'id': 1, '_links': {}}])
+            items = list(api.iter_items('posts', fields=['id']))
+            self.assertEqual(items, [{'id': 1}])
+        # the params are part of the signed url
+        self.assertIn('_fields=id%2Cmodified&oauth_consumer_key', urls[0])
+        self.assertIn('_embed=1&_fields=id&oauth_consumer_key', urls[1])
+        self.assertIn('_fields=id', urls[2])
+
+    def test_api_get_fields_debug(self):
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock ignoring _fields """
+            return {'status_code': 200,
+                    'content': b'[{"id": 1, "content": "long"}]'}
+
+        # logging the response decodes it before the projection is set
+        logger = logging.getLogger('wordpress.transport')
+        logger.setLevel(logging.DEBUG)
+        self.addCleanup(logger.setLevel, logging.NOTSET)
+        api = API(
+            url='http://woo.test/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+        )
+        with HTTMock(woo_test_mock):
+            response = api.get('posts', fields=['id'])
+            self.assertEqual(response.json(), [{'id': 1}])
+            items = list(api.iter_items('posts', fields=['id']))
+            self.assertEqual(items, [{'id': 1}])
@@ -0,0 +1,125 @@
+""" Retry Tests """
+from __future__ import unicode_literals
+
+import unittest
+from email.utils import formatdate
+from time import time
+
+from httmock import HTTMock, all_requests
+from requests import Response
+from requests.exceptions import ConnectionError
+from wordpress.api import API
+from wordpress.helpers import UrlUtils
+from wordpress.retry import RetryPolicy
+
+
+class NoSleepRetryPolicy(RetryPolicy):
+    def __init__(self, *args, **kwargs):
+        super(NoSleepRetryPolicy, self).__init__(*args, **kwargs)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class RetryPolicyTestcases(unittest.TestCase):
+    def make_response(self, status_code, headers=None):
+        response = Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        return response
+
+    def test_from_value(self):
+        self.assertIsNone(RetryPolicy.from_value(None))
+        self.assertEqual(RetryPolicy.from_value(5).total, 5)
+        policy = RetryPolicy()
+        self.assertIs(RetryPolicy.from_value(policy), policy)
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, backoff_max=5, jitter=False)
+        self.assertEqual(
+            [policy.get_backoff(attempt) for attempt in range(5)],
+            [1, 2, 4, 5, 5]
+        )
+        policy = RetryPolicy(backoff_factor=1, backoff_max=5)
+        for attempt in range(5):
+            self.assertTrue(0 <= policy.get_backoff(attempt) <= 5)
+
+    def test_retry_after(self):
+        policy = RetryPolicy(backoff_max=5, jitter=False)
+        delay = policy.get_retry_delay(
+            'GET', 0, self.make_response(503, {'Retry-After': '20'}))
+        self.assertEqual(delay, 20)
+        delay = policy.get_retry_delay('GET', 0, self.make_response(
+            429, {'Retry-After': formatdate(time() + 60, usegmt=True)}))
+        self.assertTrue(55 < delay <= 60)
+
+    def test_retryable(self):
+        policy = RetryPolicy(total=2)
+        self.assertIsNotNone(
+            policy.get_retry_delay('GET', 0, self.make_response(503)))
+        self.assertIsNone(
+            policy.get_retry_delay('GET', 2, self.make_response(503)))
+        self.assertIsNone(
+            policy.get_retry_delay('GET', 0, self.make_response(500)))
+        self.assertIsNone(
+            policy.get_retry_delay('POST', 0, self.make_response(503)))
+        self.assertIsNotNone(
+            policy.get_retry_delay('POST', 0, self.make_response(429)))
+        self.assertIsNotNone(policy.get_retry_delay(
+            'GET', 0, exception=ConnectionError()))
+        self.assertIsNone(policy.get_retry_delay(
+            'POST', 0, exception=ConnectionError()))
+
+
+class APIRetryTestcases(unittest.TestCase):
+    def setUp(self):
+        self.policy = NoSleepRetryPolicy(total=3)
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            version="wc/v3",
+            retries=self.policy,
+        )
+        self.nonces = []
+
+    def flaky_mock(self, responses):
+        responses = list(responses)
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            self.nonces.append(
+                UrlUtils.get_query_singular(request.url, 'oauth_nonce'))
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return woo_test_mock
+
+    def test_retries_and_resigns(self):
+        responses = [
+            {'status_code': 503, 'content': b'busy'},
+            ConnectionError(),
+            {'status_code': 200, 'content': b'[]'},
+        ]
+        with HTTMock(self.flaky_mock(responses)):
+            response = self.api.get('products')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.policy.sleeps), 2)
+        self.assertEqual(len(set(self.nonces)), 3)
+
+    def test_gives_up(self):
+        responses = [{'status_code': 503, 'content': b'busy'}] * 4
+        with HTTMock(self.flaky_mock(responses)):
+            with self.assertRaises(UserWarning):
+                self.api.get('products')
+        self.assertEqual(len(self.nonces), 4)
+
+    def test_handled_status_not_retried(self):
+        responses = [{'status_code': 503, 'content': b'busy'}]
+        with HTTMock(self.flaky_mock(responses)):
+            response = self.api.get('products', handle_status_codes=[503])
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.policy.sleeps, [])
@@ -0,0 +1,170 @@
+""" Sync Tests """
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from httmock import HTTMock, all_requests
+from six.moves.urllib.parse import parse_qsl
+from wordpress import API
+from wordpress.sync import (JSONSyncState, MemorySyncState, SQLiteSyncState,
+                            Sync, SyncState)
+
+
+class SyncTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            version='wc/v3',
+        )
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.products = [
+            {'id': 1, 'date_modified_gmt': '2020-01-01T10:00:00'},
+            {'id': 2, 'date_modified_gmt': '2020-01-02T10:00:00'},
+            {'id': 3, 'date_modified_gmt': '2020-01-02T10:00:00'},
+        ]
+        self.queries = []
+
+    @property
+    def products_mock(self):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ Products endpoint filtering on modified_after """
+            query = dict(parse_qsl(url.query))
+            self.queries.append(query)
+            products = self.products
+            if 'modified_after' in query:
+                products = [
+                    product for product in products
+                    if product['date_modified_gmt'] > query['modified_after']
+                ]
+            per_page = int(query.get('per_page', 10))
+            page = int(query.get('page', 1))
+            total_pages = max(1, (len(products) + per_page - 1) // per_page)
+            return {
+                'status_code': 200,
+                'headers': {'X-WP-TotalPages': str(total_pages)},
+                'content': json.dumps(
+                    products[(page - 1) * per_page:page * per_page]
+                ).encode('utf-8'),
+            }
+        return woo_test_mock
+
+    def get_changed_ids(self, sync):
+        with HTTMock(self.products_mock):
+            return [item['id'] for item in sync.iter_changes('products')]
+
+    def test_incremental_sync(self):
+        sync = Sync(self.api, per_page=2)
+        self.assertEqual(self.get_changed_ids(sync), [1, 2, 3])
+        self.assertNotIn('modified_after', self.queries[0])
+        self.assertEqual(self.get_changed_ids(sync), [])
+        self.assertEqual(
+            self.queries[-1]['modified_after'], '2020-01-02T09:59:59')
+        self.assertEqual(self.queries[-1]['dates_are_gmt'], 'true')
+
+        # saved in the same second as the mark
+        self.products.append(
+            {'id': 4, 'date_modified_gmt': '2020-01-02T10:00:00'})
+        self.products[0]['date_modified_gmt'] = '2020-01-03T08:00:00'
+        self.assertEqual(self.get_changed_ids(sync), [1, 4])
+        self.assertEqual(self.get_changed_ids(sync), [])
+
+        sync.reset('products')
+        self.assertEqual(self.get_changed_ids(sync), [1, 2, 3, 4])
+
+    def test_interrupted_sync_not_saved(self):
+        sync = Sync(self.api, per_page=2)
+        with HTTMock(self.products_mock):
+            changes = sync.iter_changes('products')
+            next(changes)
+            changes.close()
+        self.assertEqual(self.get_changed_ids(sync), [1, 2, 3])
+
+    def test_state_stores(self):
+        self.assertIsInstance(SyncState.from_value(None), MemorySyncState)
+        json_path = os.path.join(self.tmp_dir, 'sync', 'state.json')
+        sqlite_path = os.path.join(self.tmp_dir, 'state.sqlite')
+        self.assertIsInstance(SyncState.from_value(json_path), JSONSyncState)
+        self.assertIsInstance(
+            SyncState.from_value(sqlite_path), SQLiteSyncState)
+
+        for path in [json_path, sqlite_path]:
+            self.assertEqual(
+                self.get_changed_ids(Sync(self.api, path)), [1, 2, 3])
+            # a new process resumes from the stored mark
+            self.assertEqual(self.get_changed_ids(Sync(self.api, path)), [])
+            state = SyncState.from_value(path)
+            key = Sync(self.api).get_key('products')
+            self.assertEqual(state.get(key), {
+                'modified': '2020-01-02T10:00:00', 'ids': [2, 3]})
+            state.delete(key)
+            self.assertIsNone(state.get(key))
+
+
+class WordPressSyncTestcases(unittest.TestCase):
+    """ WordPress compares modified_after with local dates """
+
+    def setUp(self):
+        self.api = API(
+            url='https://wp.test/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+        )
+        # site at UTC-5
+        self.posts = [
+            {'id': 1, 'modified': '2020-01-01T10:00:00',
+             'modified_gmt': '2020-01-01T15:00:00'},
+        ]
+        self.queries = []
+
+    @property
+    def posts_mock(self):
+        @all_requests
+        def wp_test_mock(url, request):
+            """ Posts endpoint ignoring dates_are_gmt like WordPress """
+            query = dict(parse_qsl(url.query))
+            self.queries.append(query)
+            posts = [
+                post for post in self.posts
+                if post['modified'] > query.get('modified_after', '')
+            ]
+            return {
+                'status_code': 200,
+                'headers': {'X-WP-TotalPages': '1'},
+                'content': json.dumps(posts).encode('utf-8'),
+            }
+        return wp_test_mock
+
+    def get_changed_ids(self, sync):
+        with HTTMock(self.posts_mock):
+            return [item['id'] for item in sync.iter_changes('posts')]
+
+    def test_local_mark(self):
+        state = MemorySyncState()
+        sync = Sync(self.api, state)
+        self.assertEqual(sync.date_fields, Sync.local_date_fields)
+        self.assertEqual(self.get_changed_ids(sync), [1])
+        # modified within the UTC offset after the mark
+        self.posts.append({'id': 2, 'modified': '2020-01-01T12:00:00',
+                           'modified_gmt': '2020-01-01T17:00:00'})
+        self.assertEqual(self.get_changed_ids(sync), [2])
+        self.assertEqual(
+            self.queries[-1]['modified_after'], '2020-01-01T09:59:59')
+        self.assertNotIn('dates_are_gmt', self.queries[-1])
+        self.assertEqual(state.get(sync.get_key('posts')), {
+            'modified': '2020-01-01T12:00:00', 'ids': [2], 'local': True})
+
+    def test_gmt_mark_ignored(self):
+        state = MemorySyncState()
+        state.set(Sync(self.api).get_key('posts'), {
+            'modified': '2020-01-01T15:00:00', 'ids': [1]})
+        self.posts.append({'id': 2, 'modified': '2020-01-01T12:00:00',
+                           'modified_gmt': '2020-01-01T17:00:00'})
+        self.assertEqual(self.get_changed_ids(Sync(self.api, state)), [1, 2])
@@ -0,0 +1,150 @@
+""" Tracing Tests """
+from __future__ import unicode_literals
+
+import unittest
+from contextlib import contextmanager
+
+from httmock import HTTMock, all_requests
+from wordpress import API, tracing
+from wordpress.retry import RetryPolicy
+from wordpress.tracing import Tracer
+
+
+class FakeSpan(object):
+    def __init__(self, name, attributes, kind, parent):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.kind = kind
+        self.parent = parent
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class FakeTracer(object):
+    """ Records spans like an OpenTelemetry tracer """
+
+    def __init__(self):
+        self.spans = []
+        self.stack = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None, kind=None):
+        parent = self.stack[-1].name if self.stack else None
+        span = FakeSpan(name, attributes, kind, parent)
+        self.spans.append(span)
+        self.stack.append(span)
+        try:
+            yield span
+        finally:
+            self.stack.pop()
+
+    def get_current_span(self):
+        return self.stack[-1] if self.stack else tracing.NoopSpan()
+
+
+class FakePropagator(object):
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def inject(self, carrier):
+        carrier['traceparent'] = '00-%s-01' % self.tracer.stack[-1].name
+
+
+class FakeTrace(object):
+    class SpanKind(object):
+        CLIENT = 'client'
+
+    def __init__(self, tracer):
+        self.get_current_span = tracer.get_current_span
+
+
+class TracerTestcases(unittest.TestCase):
+    def test_noop(self):
+        tracer = Tracer()
+        self.assertFalse(tracer.enabled)
+        with tracer.span('name', {'key': 'value'}) as span:
+            span.set_attribute('key', 'value')
+        self.assertEqual(tracer.inject({}), {})
+        self.assertFalse(Tracer.from_value(False).enabled)
+
+    def test_request_attributes(self):
+        self.assertEqual(
+            Tracer.get_request_attributes('get', 'products/12?page=3'),
+            {'http.method': 'GET', 'wordpress.endpoint': 'products/{id}',
+             'wordpress.page': 3}
+        )
+        self.assertEqual(
+            Tracer.get_url_attribute('http://woo.test/a?oauth_signature=x'),
+            'http://woo.test/a'
+        )
+
+
+class APITracingTestcases(unittest.TestCase):
+    def setUp(self):
+        self.tracer = FakeTracer()
+        self.api = API(
+            url="http://woo.test",
+            consumer_key="ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            consumer_secret="cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            tracer=Tracer(self.tracer, FakePropagator(self.tracer)),
+        )
+        self.addCleanup(setattr, tracing, 'otel_trace', tracing.otel_trace)
+        tracing.otel_trace = FakeTrace(self.tracer)
+
+    def test_spans(self):
+        self.api.retry = RetryPolicy(total=1, backoff_factor=0)
+        sent_headers = []
+        statuses = [503, 200]
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            sent_headers.append(request.headers)
+            return {'status_code': statuses.pop(0), 'content': b'[]'}
+
+        with HTTMock(woo_test_mock):
+            self.api.get('products/12/variations?page=2')
+
+        self.assertEqual(
+            [(span.name, span.parent) for span in self.tracer.spans],
+            [('GET products/{id}/variations', None),
+             ('wordpress.sign', 'GET products/{id}/variations'),
+             ('HTTP GET', 'GET products/{id}/variations'),
+             ('wordpress.sign', 'GET products/{id}/variations'),
+             ('HTTP GET', 'GET products/{id}/variations')]
+        )
+        request_span, http_span = self.tracer.spans[0], self.tracer.spans[-1]
+        self.assertEqual(request_span.attributes, {
+            'http.method': 'GET',
+            'wordpress.endpoint': 'products/{id}/variations',
+            'wordpress.page': 2,
+            'wordpress.retry_count': 1,
+            'http.status_code': 200,
+        })
+        self.assertEqual(http_span.kind, 'client')
+        self.assertEqual(http_span.attributes['http.status_code'], 200)
+        self.assertEqual(
+            http_span.attributes['http.response_content_length'], 2)
+        self.assertNotIn('?', http_span.attributes['http.url'])
+        self.assertEqual(
+            [headers['traceparent'] for headers in sent_headers],
+            ['00-HTTP GET-01'] * 2
+        )
+
+    def test_post_mortem_span(self):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            return {'status_code': 404, 'content': b'{"code": "nope"}'}
+
+        with HTTMock(woo_test_mock):
+            with self.assertRaises(UserWarning):
+                self.api.post('products', {'name': 'Cap'})
+        post_mortem_span = self.tracer.spans[-1]
+        self.assertEqual(post_mortem_span.name, 'wordpress.post_mortem')
+        self.assertEqual(post_mortem_span.parent, 'POST products')
+        self.assertEqual(
+            self.tracer.spans[2].attributes['http.request_content_length'],
+            len(b'{"name": "Cap"}')
+        )
@@ -1,9 +1,12 @@
 """ API Tests """
 from __future__ import unicode_literals
 
+import logging
 import unittest
 
 from httmock import HTTMock, all_requests
+from requests.adapters import HTTPAdapter
+from wordpress.helpers import ResponseUtils
 from wordpress.transport import API_Requests_Wrapper
 
 
@@ -41,3 +44,74 @@ class TransportTestcases(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.request.url,
                          'https://woo.test:8888/wp-json/wp/v2/posts')
+
+    def test_response_not_decoded_without_debug(self):
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock """
+            return {'status_code': 200,
+                    'content': b'{"id": 1}'}
+
+        self.requester.logger.setLevel(logging.INFO)
+        with HTTMock(woo_test_mock):
+            response = self.requester.request(
+                "GET", "https://woo.test:8888/wp-json/wp/v2/posts")
+        self.assertNotIn('_decoded_json', response.__dict__)
+
+    def test_response_decoded_once_with_debug(self):
+        @all_requests
+        def woo_test_mock(*args, **kwargs):
+            """ URL Mock """
+            return {'status_code': 200,
+                    'content': b'{"id": 1}'}
+
+        self.requester.logger.setLevel(logging.DEBUG)
+        self.addCleanup(self.requester.logger.setLevel, logging.NOTSET)
+        with HTTMock(woo_test_mock):
+            response = self.requester.request(
+                "GET", "https://woo.test:8888/wp-json/wp/v2/posts")
+        self.assertEqual(response._decoded_json, ({'id': 1}, None))
+        response._content = b'{"id": 2}'
+        self.assertEqual(ResponseUtils.get_json(response), {'id': 1})
+
+    def test_default_adapters(self):
+        adapter = self.requester.session.get_adapter('https://woo.test:8888/')
+        self.assertEqual(adapter._pool_maxsize, 10)
+
+    def test_pool_options(self):
+        requester = API_Requests_Wrapper(
+            url='https://woo.test:8888/',
+            pool_connections=4,
+            pool_maxsize=32,
+            pool_block=True,
+        )
+        adapter = requester.session.get_adapter('https://woo.test:8888/')
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+
+    def test_pool_size_follows_workers(self):
+        requester = API_Requests_Wrapper(
+            url='https://woo.test:8888/', workers=24)
+        adapter = requester.session.get_adapter('https://woo.test:8888/')
+        self.assertEqual(adapter._pool_maxsize, 24)
+
+    def test_per_host_adapters(self):
+        custom_adapter = HTTPAdapter()
+        requester = API_Requests_Wrapper(
+            url='https://woo.test:8888/',
+            pool_maxsize=16,
+            adapters={
+                'https://woo.test:8888': {'pool_block': True},
+                'https://cdn.woo.test': custom_adapter,
+            }
+        )
+        adapter = requester.session.get_adapter('https://woo.test:8888/')
+        self.assertEqual(adapter._pool_maxsize, 16)
+        self.assertTrue(adapter._pool_block)
+        other_adapter = requester.session.get_adapter('https://other.test/')
+        self.assertFalse(other_adapter._pool_block)
+        self.assertIs(
+            requester.session.get_adapter('https://cdn.woo.test/a.jpg'),
+            custom_adapter
+        )
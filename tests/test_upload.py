@@ -0,0 +1,246 @@
+""" Upload Tests """
+from __future__ import unicode_literals
+
+import io
+import itertools
+import json
+import os
+import tempfile
+import unittest
+
+from httmock import HTTMock, all_requests
+from wordpress import API
+from wordpress.retry import RetryPolicy
+from wordpress.upload import MediaUpload, UploadIndex, UploadReader
+
+
+class UploadTestcases(unittest.TestCase):
+    def setUp(self):
+        self.img_path = 'tests/data/test.jpg'
+        with open(self.img_path, 'rb') as test_file:
+            self.img_data = test_file.read()
+        self.api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+        )
+
+    def test_reader_progress(self):
+        progress = []
+        reader = UploadReader(
+            io.BytesIO(b'x' * 10),
+            progress=lambda sent, total: progress.append((sent, total)),
+            chunk_size=4
+        )
+        self.assertEqual(reader.len, 10)
+        self.assertEqual(b''.join(reader), b'x' * 10)
+        self.assertEqual(progress, [(4, 10), (8, 10), (10, 10)])
+
+    def test_reader_rewind(self):
+        fileobj = io.BytesIO(b'headerbody')
+        fileobj.seek(6)
+        reader = UploadReader(fileobj)
+        self.assertEqual(reader.len, 4)
+        self.assertEqual(reader.read(), b'body')
+        reader.rewind()
+        self.assertEqual(reader.read(), b'body')
+
+    def test_media_upload_headers(self):
+        upload = MediaUpload(self.img_path)
+        try:
+            self.assertEqual(upload.get_headers(), {
+                'Content-Type': 'image/jpeg',
+                'Content-Disposition': 'attachment; filename="test.jpg"',
+            })
+        finally:
+            upload.close()
+        upload = MediaUpload(io.BytesIO(b''), filename='été.png')
+        self.assertEqual(
+            upload.get_headers()['Content-Disposition'],
+            "attachment; filename*=UTF-8''%C3%A9t%C3%A9.png"
+        )
+        with self.assertRaises(UserWarning):
+            MediaUpload(io.BytesIO(b''))
+
+    def test_media_upload_mmap(self):
+        upload = MediaUpload(self.img_path, use_mmap=True)
+        try:
+            self.assertEqual(b''.join(upload.get_reader()), self.img_data)
+        finally:
+            upload.close()
+
+        # empty files can't be mapped and are read normally
+        handle, path = tempfile.mkstemp(suffix='.png')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        upload = MediaUpload(path, use_mmap=True)
+        try:
+            self.assertEqual(b''.join(upload.get_reader()), b'')
+        finally:
+            upload.close()
+
+    def test_upload_media(self):
+        sent = {}
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            sent['headers'] = request.headers
+            sent['body'] = b''.join(request.body)
+            return {'status_code': 201,
+                    'content': b'{"id": 7}'}
+
+        progress = []
+        with HTTMock(woo_test_mock):
+            response = self.api.upload_media(
+                self.img_path,
+                progress=lambda sent, total: progress.append((sent, total))
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'id': 7})
+        self.assertEqual(sent['body'], self.img_data)
+        self.assertEqual(sent['headers']['Content-Type'], 'image/jpeg')
+        self.assertEqual(
+            sent['headers']['Content-Length'], str(len(self.img_data)))
+        self.assertEqual(
+            progress[-1], (len(self.img_data), len(self.img_data)))
+
+    def test_upload_media_json(self):
+        sent = {}
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            sent['headers'] = request.headers
+            sent['body'] = b''.join(request.body)
+            return {'status_code': 201,
+                    'content': b'{"id": 7}'}
+
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.write(handle, b'{"a": 1}')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        with HTTMock(woo_test_mock):
+            response = self.api.upload_media(path)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sent['body'], b'{"a": 1}')
+        self.assertEqual(sent['headers']['Content-Type'], 'application/json')
+
+    def test_upload_media_retry(self):
+        self.api.retry = RetryPolicy(total=1, backoff_factor=0)
+        bodies = []
+
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            bodies.append(b''.join(request.body))
+            if len(bodies) == 1:
+                return {'status_code': 429, 'content': b''}
+            return {'status_code': 201,
+                    'content': b'{"id": 7}'}
+
+        with HTTMock(woo_test_mock):
+            with open(self.img_path, 'rb') as img_file:
+                response = self.api.upload_media(img_file)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(bodies, [self.img_data, self.img_data])
+
+
+class UploadManyTestcases(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            url='https://woo.test:8888/',
+            consumer_key='ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            consumer_secret='cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX',
+            api='wp-json',
+            api_version='wp/v2',
+            workers=4,
+        )
+        self.api.retry = RetryPolicy(backoff_factor=0)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name, content in [
+            ('a.jpg', b'aaa'), ('b.jpg', b'bbb'), ('copy_of_a.jpg', b'aaa')
+        ]:
+            path = os.path.join(self.tmp_dir, name)
+            with open(path, 'wb') as img_file:
+                img_file.write(content)
+            self.paths.append(path)
+        self.index_path = os.path.join(self.tmp_dir, 'index.jsonl')
+        self.site = {}
+        self.uploads = []
+        self.media_ids = itertools.count(1)
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        os.rmdir(self.tmp_dir)
+
+    def site_mock(self, fail_uploads=0):
+        @all_requests
+        def woo_test_mock(url, request):
+            """ URL Mock """
+            query = dict(
+                item.split('=', 1) for item in url.query.split('&') if item)
+            if request.method == 'GET':
+                search = query['search'].replace('%3A', ':')
+                items = [
+                    {'id': media_id, 'description': {'rendered': marker}}
+                    for marker, media_id in self.site.items()
+                    if search in marker
+                ]
+                return {'status_code': 200,
+                        'content': json.dumps(items).encode('utf-8')}
+            self.uploads.append(b''.join(request.body))
+            if len(self.uploads) <= fail_uploads:
+                return {'status_code': 500, 'content': b'{}'}
+            media_id = next(self.media_ids)
+            self.site[query['description'].replace('%3A', ':')] = media_id
+            return {'status_code': 201,
+                    'content': json.dumps({'id': media_id}).encode('utf-8')}
+        return woo_test_mock
+
+    def test_upload_many(self):
+        with HTTMock(self.site_mock()):
+            media_ids = self.api.upload_media_many(
+                self.paths, index=self.index_path)
+        self.assertEqual(list(media_ids), self.paths)
+        self.assertEqual(sorted(self.uploads), [b'aaa', b'bbb'])
+        self.assertEqual(media_ids[self.paths[0]], media_ids[self.paths[2]])
+        self.assertNotEqual(media_ids[self.paths[0]], media_ids[self.paths[1]])
+
+        # the local index skips the search and the upload
+        index = UploadIndex(self.index_path)
+        digest = MediaUpload.get_digest(self.paths[1])
+        self.assertEqual(index.get(digest), media_ids[self.paths[1]])
+        with HTTMock(self.site_mock()):
+            self.assertEqual(
+                self.api.upload_media_many(self.paths, index=index),
+                media_ids
+            )
+        self.assertEqual(len(self.uploads), 2)
+
+    def test_upload_many_found_on_site(self):
+        with HTTMock(self.site_mock()):
+            media_ids = self.api.upload_media_many(self.paths)
+            self.assertEqual(
+                self.api.upload_media_many(self.paths), media_ids)
+        self.assertEqual(len(self.uploads), 2)
+
+    def test_upload_many_retries_and_failures(self):
+        missing_path = os.path.join(self.tmp_dir, 'missing.jpg')
+        with HTTMock(self.site_mock(fail_uploads=1)):
+            media_ids = self.api.upload_media_many(
+                self.paths[:1] + [missing_path], workers=1)
+        self.assertEqual(len(self.uploads), 2)
+        self.assertTrue(media_ids[self.paths[0]])
+        self.assertIsNone(media_ids[missing_path])
+
+        self.uploads = []
+        with HTTMock(self.site_mock(fail_uploads=3)):
+            media_ids = self.api.upload_media_many(
+                self.paths[1:2], attempts=2)
+        self.assertEqual(len(self.uploads), 2)
+        self.assertIsNone(media_ids[self.paths[1]])
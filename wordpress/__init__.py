@@ -17,4 +17,9 @@ __license__ = "MIT"
 __default_api_version__ = "wp/v2"
 __default_api__ = "wp-json"
 
+import sys
+
 from wordpress.api import API
+
+if sys.version_info >= (3, 6):
+    from wordpress.aio import AsyncAPI
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress asyncio API Class
+"""
+
+__title__ = "wordpress-aio"
+
+import asyncio
+from collections import OrderedDict
+from functools import partial
+
+from requests import PreparedRequest
+from requests.auth import HTTPBasicAuth
+from requests.exceptions import ConnectionError, RequestException, Timeout
+from requests.structures import CaseInsensitiveDict
+
+from wordpress.api import API
+from wordpress.coalesce import SingleFlight
+from wordpress.helpers import UrlUtils
+from wordpress.metrics import clock
+from wordpress.response import APIResponse
+from wordpress.transport import API_Requests_Wrapper
+from wordpress.retry import RetryPolicy
+from wordpress.upload import MediaUpload, UploadIndex
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class API_AsyncRequests_Wrapper(API_Requests_Wrapper):
+    """
+    provides a wrapper for making requests on an asyncio event loop with
+    httpx, sharing the url logic of API_Requests_Wrapper.
+
+    The synchronous request methods remain available for the one-off requests
+    made by the Auth classes (e.g. OAuth_3Leg discovery).
+    """
+
+    def __init__(self, url, **kwargs):
+        super(API_AsyncRequests_Wrapper, self).__init__(url, **kwargs)
+        if httpx is None:
+            raise UserWarning(
+                "AsyncAPI requires httpx, try `pip install httpx`")
+        self.async_session = None
+
+    def get_client_kwargs(self):
+        """ Options of the httpx clients """
+        limits = httpx.Limits()
+        if 'pool_maxsize' in self.adapter_kwargs:
+            limits = httpx.Limits(
+                max_keepalive_connections=self.adapter_kwargs['pool_maxsize']
+            )
+        return dict(verify=self.verify_ssl, limits=limits)
+
+    def get_async_session(self):
+        if self.async_session is None:
+            self.async_session = httpx.AsyncClient(**self.get_client_kwargs())
+        return self.async_session
+
+    @classmethod
+    def adapt_auth(cls, auth):
+        """ Convert a requests auth object to its httpx equivalent """
+        if isinstance(auth, HTTPBasicAuth):
+            return httpx.BasicAuth(auth.username, auth.password)
+        return auth
+
+    @classmethod
+    def adapt_response(cls, response):
+        """
+        Convert a httpx response to an APIResponse so that both clients
+        return the same kind of object.
+        """
+        request = PreparedRequest()
+        request.method = response.request.method
+        request.url = str(response.request.url)
+        request.headers = CaseInsensitiveDict(response.request.headers.items())
+        try:
+            request.body = response.request.content
+        except httpx.RequestNotRead:
+            # streamed request bodies are not kept
+            request.body = None
+
+        adapted = APIResponse()
+        adapted.status_code = response.status_code
+        adapted.reason = response.reason_phrase
+        adapted.headers = CaseInsensitiveDict(response.headers.items())
+        adapted.url = str(response.url)
+        adapted.encoding = response.encoding
+        try:
+            adapted.elapsed = response.elapsed
+        except RuntimeError:
+            # elapsed is only set once the response stream is closed
+            pass
+        adapted.request = request
+        adapted._content = response.content
+        return adapted
+
+    @classmethod
+    def adapt_exception(cls, exception):
+        """
+        Convert a httpx transport error to the requests exception that the
+        retry policy understands.
+        """
+        if isinstance(exception, httpx.TimeoutException):
+            return Timeout(exception)
+        return ConnectionError(exception)
+
+    @classmethod
+    def adapt_content(cls, data, headers, asynchronous=True):
+        """
+        Convert a streamed (file-like) request body to the iterator that
+        httpx expects (an async iterator for httpx.AsyncClient), keeping its
+        Content-Length if known.
+        """
+        if not hasattr(data, 'read'):
+            return data
+        length = getattr(data, 'len', None)
+        if length is not None:
+            headers['Content-Length'] = str(length)
+        if not asynchronous:
+            return iter(data)
+
+        async def iter_chunks():
+            for chunk in data:
+                yield chunk
+
+        return iter_chunks()
+
+    def build_httpx_kwargs(self, request_kwargs, asynchronous=True):
+        """ Arguments of httpx request methods for request_kwargs """
+        headers = dict(request_kwargs['headers'])
+        content = self.adapt_content(
+            request_kwargs.get('data'), headers, asynchronous)
+        return dict(
+            method=request_kwargs['method'],
+            url=request_kwargs['url'],
+            params=request_kwargs.get('params'),
+            content=content,
+            headers=headers,
+            auth=self.adapt_auth(request_kwargs.get('auth')),
+            timeout=request_kwargs['timeout'],
+            follow_redirects=request_kwargs.get('allow_redirects', True),
+        )
+
+    async def arequest(
+        self, method, url, auth=None, params=None, data=None, event=None,
+        **kwargs
+    ):
+        request_kwargs = self.build_request_kwargs(
+            method, url, auth=auth, params=params, data=data, **kwargs
+        )
+        cache_key, cache_entry = self.get_cache_entry(request_kwargs)
+        self.log_request(request_kwargs)
+        with self.start_span(request_kwargs) as span:
+            self.tracer.inject(request_kwargs['headers'])
+            self.emit_request_start(event, request_kwargs)
+            httpx_kwargs = self.build_httpx_kwargs(request_kwargs)
+            sent = clock()
+            try:
+                response = await self.get_async_session().request(
+                    **httpx_kwargs)
+            except Exception as exc:
+                self.emit_error(event, exc)
+                raise
+            response = self.adapt_response(response)
+            response = self.update_cache(response, cache_key, cache_entry)
+            response = APIResponse.from_response(response)
+            self.log_response(response)
+            self.emit_response(event, response, sent)
+            self.end_span(span, response)
+
+        return response
+
+    async def aclose(self):
+        if self.async_session is not None:
+            await self.async_session.aclose()
+            self.async_session = None
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    Coalesces identical calls made concurrently by several tasks on an event
+    loop: the first caller of a key runs the coroutine function while the
+    others await its outcome.
+    """
+
+    async def do(self, key, function):
+        """ Await function() unless a call for key is in progress """
+        future = self.flights.get(key)
+        if future is not None:
+            # a follower being cancelled mustn't cancel the call
+            return self.copy(await asyncio.shield(future))
+        future = self.flights[key] = asyncio.get_event_loop().create_future()
+        # the outcome doesn't need to be retrieved when nobody followed
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception())
+        try:
+            result = await function()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            del self.flights[key]
+
+
+class AsyncAPI(API):
+    """
+    API Class whose request methods are coroutines.
+
+    URLs are built and signed exactly as in API, only the transport differs.
+    """
+
+    requester_class = API_AsyncRequests_Wrapper
+    single_flight_class = AsyncSingleFlight
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """ Close the connections held by the transport """
+        await self.requester.aclose()
+
+    async def _request(self, method, endpoint, data, **kwargs):
+        """ Do requests """
+
+        handle_status_codes = kwargs.pop('handle_status_codes', [])
+
+        with self._start_span(method, endpoint) as span:
+            response = self._get_cached_response(method, endpoint)
+            if response is not None:
+                span.set_attribute('wordpress.entity_cache', True)
+                return response
+            send_request = partial(
+                self._send_request, method, endpoint, data,
+                handle_status_codes, **kwargs
+            )
+            flight_key = self._get_flight_key(method, endpoint, **kwargs)
+            try:
+                if flight_key is not None:
+                    response = await self.single_flight.do(
+                        flight_key, send_request)
+                else:
+                    response = await send_request()
+            finally:
+                # writes invalidate the cache even when they fail
+                self._update_entity_cache(method, endpoint, response)
+            span.set_attribute('http.status_code', response.status_code)
+
+            return self._handle_response(response, handle_status_codes)
+
+    async def _send_request(
+        self, method, endpoint, data, handle_status_codes, **kwargs
+    ):
+        """ Send a request, retrying it according to the retry policy """
+        attempt = 0
+        while True:
+            # wait for the rate limiter before signing, see API
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            event = self.requester.start_event(method, endpoint, attempt)
+            request_kwargs = self._prepare_request(
+                method, endpoint, data, event=event, **kwargs)
+            try:
+                response = await self.requester.arequest(**request_kwargs)
+            except httpx.TransportError as exc:
+                delay = self._get_retry_delay(
+                    method, attempt,
+                    exception=self.requester.adapt_exception(exc))
+                if delay is None:
+                    raise
+            else:
+                delay = self._get_retry_delay(
+                    method, attempt, response=response,
+                    handle_status_codes=handle_status_codes
+                )
+                if delay is None:
+                    break
+            self._emit_retry(event, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+            self.requester.tracer.current_span().set_attribute(
+                'wordpress.retry_count', attempt)
+
+        return response
+
+    async def get(self, endpoint, fields=None, embed=None, **kwargs):
+        """ Get requests, see API.get """
+        endpoint = self.get_fields_endpoint(endpoint, fields, embed)
+        response = await self._request("GET", endpoint, None, **kwargs)
+        projection = self.get_projection(fields, embed)
+        if projection:
+            response.projection = projection
+        return response
+
+    async def post(self, endpoint, data, **kwargs):
+        """ POST requests """
+        return await self._request("POST", endpoint, data, **kwargs)
+
+    async def put(self, endpoint, data, **kwargs):
+        """ PUT requests """
+        return await self._request("PUT", endpoint, data, **kwargs)
+
+    async def delete(self, endpoint, **kwargs):
+        """ DELETE requests """
+        return await self._request("DELETE", endpoint, None, **kwargs)
+
+    async def options(self, endpoint, **kwargs):
+        """ OPTIONS requests """
+        return await self._request("OPTIONS", endpoint, None, **kwargs)
+
+    async def upload_media(
+        self, source, filename=None, mime_type=None, endpoint='media',
+        progress=None, use_mmap=False, chunk_size=64 * 1024, **kwargs
+    ):
+        """ POST a file to the media endpoint, streaming it from disk """
+        upload = MediaUpload(source, filename, mime_type, use_mmap)
+        try:
+            headers = upload.get_headers()
+            headers.update(kwargs.pop('headers', {}))
+            return await self.post(
+                endpoint, upload.get_reader(progress, chunk_size),
+                headers=headers, **kwargs
+            )
+        finally:
+            upload.close()
+
+    async def find_media(self, digest, endpoint='media'):
+        """ Id of the media with the given sha256 digest, see API """
+        response = await self.get(
+            self.get_media_search_endpoint(digest, endpoint))
+        return self.get_media_id(response.json(), digest)
+
+    async def upload_media_many(
+        self, paths, workers=None, index=None, search=True, attempts=3,
+        endpoint='media', **kwargs
+    ):
+        """
+        Upload many files with up to `workers` concurrent uploads, skipping
+        files that were already uploaded, see API.upload_media_many.
+        """
+        if workers is None:
+            workers = self.workers
+        index = UploadIndex.from_value(index)
+        paths = list(paths)
+        loop = asyncio.get_event_loop()
+        # hash the files in threads so that the event loop isn't blocked
+        digests = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, self.get_media_digest, path)
+            for path in paths
+        ])
+        unique_paths = self.get_unique_media(paths, digests)
+        semaphore = asyncio.Semaphore(max(workers, 1))
+
+        async def upload(digest, path):
+            async with semaphore:
+                return digest, await self._upload_unique_media(
+                    path, digest, index, search, attempts, endpoint,
+                    **kwargs)
+
+        media_ids = dict(await asyncio.gather(*[
+            upload(digest, path) for digest, path in unique_paths.items()
+        ]))
+        return OrderedDict(
+            (path, media_ids.get(digest))
+            for path, digest in zip(paths, digests)
+        )
+
+    async def _upload_unique_media(
+        self, path, digest, index, search, attempts, endpoint, **kwargs
+    ):
+        media_id = index.get(digest)
+        if media_id is not None:
+            return media_id
+        retry = self.retry or RetryPolicy()
+        for attempt in range(attempts):
+            try:
+                if search:
+                    media_id = await self.find_media(digest, endpoint)
+                if media_id is None:
+                    response = await self.upload_media(
+                        path,
+                        endpoint=self.get_media_upload_endpoint(
+                            digest, endpoint),
+                        **kwargs
+                    )
+                    media_id = response.json()['id']
+                index.set(digest, media_id)
+                return media_id
+            except (
+                RequestException, httpx.TransportError, UserWarning,
+                ValueError, KeyError
+            ) as exc:
+                self.logger.warning(
+                    "uploading %s failed (attempt %d): %s" % (
+                        path, attempt + 1, exc))
+            if attempt + 1 < attempts:
+                await asyncio.sleep(retry.get_backoff(attempt))
+        return None
+
+    async def batch(
+        self, endpoint, create=None, update=None, delete=None, chunk_size=100,
+        workers=None, **kwargs
+    ):
+        """
+        Create, update and delete many objects through a WooCommerce batch
+        endpoint, see API.batch. Up to `workers` requests are sent
+        concurrently.
+        """
+        if workers is None:
+            workers = self.workers
+        endpoint = self.get_batch_endpoint(endpoint)
+        payloads = self.get_batch_payloads(create, update, delete, chunk_size)
+        semaphore = asyncio.Semaphore(max(workers, 1))
+
+        async def post_batch(payload):
+            async with semaphore:
+                response = await self.post(endpoint, payload, **kwargs)
+            return response.json()
+
+        results = await asyncio.gather(
+            *[post_batch(payload) for payload in payloads])
+        return self.merge_batch_results(results)
+
+    async def iter_pages(
+        self, endpoint, per_page=100, prefetch=True, **kwargs
+    ):
+        """
+        Lazily GET every page of a collection endpoint, yielding responses.
+
+        While a page is being consumed, the following page is requested in
+        a separate task unless `prefetch` is False.
+        """
+        if per_page:
+            endpoint = UrlUtils.set_query_singular(
+                endpoint, 'per_page', per_page)
+        page = int(UrlUtils.get_query_singular(endpoint, 'page', 1))
+
+        response = await self.get(endpoint, **kwargs)
+        while response is not None:
+            next_endpoint = self.get_next_endpoint(response, endpoint, page)
+            task = None
+            if next_endpoint is not None and prefetch:
+                task = asyncio.ensure_future(
+                    self.get(next_endpoint, **kwargs))
+            try:
+                yield response
+            except GeneratorExit:
+                if task is not None:
+                    task.cancel()
+                raise
+            if next_endpoint is None:
+                break
+            if task is not None:
+                response = await task
+            else:
+                response = await self.get(next_endpoint, **kwargs)
+            endpoint = next_endpoint
+            page += 1
+
+    async def iter_items(self, endpoint, per_page=100, **kwargs):
+        """
+        Lazily GET every item of a collection endpoint across all pages,
+        yielding decoded items one at a time.
+        """
+        async for response in self.iter_pages(endpoint, per_page, **kwargs):
+            items = self.get_page_items(response.json())
+            if not items:
+                break
+            for item in items:
+                yield item
@@ -9,11 +9,23 @@ from __future__ import unicode_literals
 # from requests import request
 import json
 import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from six import text_type
+from requests.exceptions import RequestException
+from six import binary_type, string_types, text_type
 from wordpress.auth import BasicAuth, NoAuth, OAuth, OAuth_3Leg
-from wordpress.helpers import StrUtils, UrlUtils
+from wordpress.cache import EntityCache
+from wordpress.coalesce import SingleFlight
+from wordpress.helpers import (LazyUserWarning, ResponseUtils, SeqUtils,
+                               StrUtils, UrlUtils)
+from wordpress.metrics import clock
+from wordpress.ratelimit import TokenBucket
+from wordpress.retry import RetryPolicy
+from wordpress.tracing import Tracer
 from wordpress.transport import API_Requests_Wrapper
+from wordpress.upload import MediaUpload, UploadIndex
 
 __title__ = "wordpress-api"
 
@@ -21,9 +33,12 @@ __title__ = "wordpress-api"
 class API(object):
     """ API Class """
 
+    requester_class = API_Requests_Wrapper
+    single_flight_class = SingleFlight
+
     def __init__(self, url, consumer_key, consumer_secret, **kwargs):
         self.logger = logging.getLogger(__name__)
-        self.requester = API_Requests_Wrapper(url=url, **kwargs)
+        self.requester = self.get_requester(url, **kwargs)
 
         auth_kwargs = dict(
             requester=self.requester,
@@ -49,6 +64,27 @@ class API(object):
 
         self.auth = auth_class(**auth_kwargs)
 
+        self.retry = RetryPolicy.from_value(kwargs.get('retries'))
+        self.rate_limiter = TokenBucket.from_value(
+            kwargs.get('rate_limit'), kwargs.get('rate_limit_burst'))
+        self.workers = kwargs.get('workers', 1)
+        self.executor = kwargs.get('executor')
+        self.entity_cache = EntityCache.from_value(kwargs.get('entity_cache'))
+        self.single_flight = self.single_flight_class.from_value(
+            kwargs.get('coalesce'), copy=lambda response: response.copy())
+
+    def get_requester(self, url, **kwargs):
+        """
+        Create the transport of the API from the `transport` argument, which
+        can be an API_Requests_Wrapper (used as is) or a callable creating
+        one from the url and the options of the API, like a subclass of
+        API_Requests_Wrapper. Defaults to requester_class.
+        """
+        transport = kwargs.get('transport') or self.requester_class
+        if isinstance(transport, API_Requests_Wrapper):
+            return transport
+        return transport(url=url, **kwargs)
+
     @property
     def url(self):
         return self.requester.url
@@ -95,7 +131,7 @@ class API(object):
 
         response_json = {}
         try:
-            response_json = response.json()
+            response_json = ResponseUtils.get_json(response)
         except ValueError:
             pass
 
@@ -186,60 +222,281 @@ class API(object):
                     header_url = StrUtils.eviscerate(header_url, '/')
                     remedy = "try changing url to %s" % header_url
 
-        msg = (
-            "API call to %s returned \nCODE: "
-            "%s\nRESPONSE:%s \nHEADERS: %s\nREQ_BODY:%s"
-        ) % tuple(map(StrUtils.to_text, [
-            request_url,
-            response.status_code,
-            UrlUtils.beautify_response(response),
-            response_headers,
-            StrUtils.to_binary(request_body)[:1000]
-        ]))
-        if reason:
-            msg += "\nBecause of %s" % StrUtils.to_binary(reason)
-        if remedy:
-            msg += "\n%s" % remedy
-        raise UserWarning(msg)
+        def get_message():
+            # only built when the warning is formatted
+            msg = (
+                "API call to %s returned \nCODE: "
+                "%s\nRESPONSE:%s \nHEADERS: %s\nREQ_BODY:%s"
+            ) % tuple(map(StrUtils.to_text, [
+                request_url,
+                response.status_code,
+                UrlUtils.beautify_response(response),
+                response_headers,
+                StrUtils.to_binary(request_body)[:1000]
+            ]))
+            if reason:
+                msg += "\nBecause of %s" % StrUtils.to_binary(reason)
+            if remedy:
+                msg += "\n%s" % remedy
+            return msg
+
+        raise LazyUserWarning(get_message)
+
+    def _prepare_request(self, method, endpoint, data, event=None, **kwargs):
+        """
+        Build the signed url, auth and encoded body of a request, returning
+        the keyword arguments for the requester's request method.
 
-    def __request(self, method, endpoint, data, **kwargs):
-        """ Do requests """
+        The time taken by each step is recorded on event if given.
+        """
 
+        started = clock()
         endpoint_url = self.requester.endpoint_url(endpoint)
+        if event is not None:
+            started = event.time('url_build', started)
         endpoint_url = self.auth.get_auth_url(endpoint_url, method, **kwargs)
         auth = self.auth.get_auth()
+        if event is not None:
+            started = event.time('sign', started)
 
         content_type = 'application/json'
         for key, value in kwargs.get('headers', {}).items():
             if key.lower() == 'content-type':
                 content_type = value.lower()
 
-        if data is not None and content_type.startswith('application/json'):
-            data = StrUtils.jsonencode(json.dumps(data.decode("utf-8")), ensure_ascii=False)
+        if hasattr(data, 'rewind'):
+            # streamed bodies are sent again from the start on retries
+            data.rewind()
+
+        if (
+            data is not None
+            and content_type.startswith('application/json')
+            # file-like bodies (e.g. uploaded .json files) are sent as is
+            and not hasattr(data, 'read')
+        ):
+            if not isinstance(data, (binary_type, text_type)):
+                # data that is already a string is assumed to be encoded
+                data = StrUtils.jsonencode(data, ensure_ascii=False)
 
             # enforce utf-8 encoded binary
             data = StrUtils.to_binary(data)
 
-        handle_status_codes = kwargs.pop('handle_status_codes', [])
-
-        response = self.requester.request(
+        request_kwargs = dict(
             method=method,
             url=endpoint_url,
             auth=auth,
             data=data,
             **kwargs
         )
+        if event is not None:
+            event.time('encode', started)
+            request_kwargs['event'] = event
+        return request_kwargs
+
+    def _handle_response(self, response, handle_status_codes=None):
+        """ Diagnose responses with unexpected status codes """
+        expected_status_codes = [200, 201, 202] + (handle_status_codes or [])
+        if response.status_code not in expected_status_codes:
+            with self.requester.tracer.span('wordpress.post_mortem', {
+                'http.status_code': response.status_code
+            }):
+                self.request_post_mortem(response)
 
-        if response.status_code not in [200, 201, 202] + handle_status_codes:
-            self.request_post_mortem(response)
+        return response
+
+    def _get_retry_delay(
+        self, method, attempt, response=None, exception=None,
+        handle_status_codes=None
+    ):
+        """
+        Seconds to wait before retrying a failed attempt according to the
+        retry policy, or None if it should not be retried.
+        """
+        if self.retry is None:
+            return None
+        if (
+            response is not None
+            and response.status_code in (handle_status_codes or [])
+        ):
+            return None
+        delay = self.retry.get_retry_delay(
+            method, attempt, response=response, exception=exception)
+        if delay is not None:
+            self.logger.info(
+                "retrying %s request (attempt %d) in %.2fs because of %s" % (
+                    method, attempt + 1, delay,
+                    exception if response is None else response.status_code
+                )
+            )
+        return delay
+
+    @classmethod
+    def _emit_retry(cls, event, delay):
+        if event is not None:
+            event.retry_delay = delay
+            event.emit('on_retry')
+
+    def _get_cached_response(self, method, endpoint):
+        """ Response to a GET request served by the entity cache, if any """
+        if self.entity_cache is None:
+            return None
+        return self.entity_cache.get_response(
+            method, self.requester.relative_endpoint(endpoint),
+            self.requester.endpoint_url(endpoint))
+
+    def _update_entity_cache(self, method, endpoint, response):
+        if self.entity_cache is not None:
+            # the same object has the same key however its url is written
+            self.entity_cache.update(
+                method, self.requester.relative_endpoint(endpoint), response)
+
+    def _get_flight_key(self, method, endpoint, **kwargs):
+        """
+        Key identifying identical GET requests for coalescing, from the url
+        before it is signed (as signing makes every url unique). None if the
+        request can't be coalesced.
+        """
+        if (
+            self.single_flight is None
+            or method.upper() != 'GET'
+            or kwargs.get('stream')
+        ):
+            return None
+        url = UrlUtils.canonical_url(self.requester.endpoint_url(endpoint))
+        options = []
+        for key, value in sorted(kwargs.items()):
+            if isinstance(value, dict):
+                value = sorted(value.items())
+            options.append((key, repr(value)))
+        return url, tuple(options)
+
+    def _start_span(self, method, endpoint):
+        """ Span of an API request, see wordpress.tracing.Tracer """
+        tracer = self.requester.tracer
+        if not tracer.enabled:
+            return Tracer.noop_span
+        attributes = Tracer.get_request_attributes(method, endpoint)
+        return tracer.span('%s %s' % (
+            attributes['http.method'], attributes['wordpress.endpoint']
+        ), attributes)
+
+    def __request(self, method, endpoint, data, **kwargs):
+        """ Do requests """
+
+        handle_status_codes = kwargs.pop('handle_status_codes', [])
+
+        with self._start_span(method, endpoint) as span:
+            response = self._get_cached_response(method, endpoint)
+            if response is not None:
+                span.set_attribute('wordpress.entity_cache', True)
+                return response
+            send_request = partial(
+                self.__send_request, method, endpoint, data,
+                handle_status_codes, **kwargs
+            )
+            flight_key = self._get_flight_key(method, endpoint, **kwargs)
+            try:
+                if flight_key is not None:
+                    response = self.single_flight.do(flight_key, send_request)
+                else:
+                    response = send_request()
+            finally:
+                # writes invalidate the cache even when they fail
+                self._update_entity_cache(method, endpoint, response)
+            span.set_attribute('http.status_code', response.status_code)
+
+            return self._handle_response(response, handle_status_codes)
+
+    def __send_request(
+        self, method, endpoint, data, handle_status_codes, **kwargs
+    ):
+        """ Send a request, retrying it according to the retry policy """
+        attempt = 0
+        while True:
+            # wait for the rate limiter first, so that the OAuth timestamp
+            # and the event don't include the time spent waiting
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            event = self.requester.start_event(method, endpoint, attempt)
+            # every attempt is signed again, as OAuth nonces can't be replayed
+            request_kwargs = self._prepare_request(
+                method, endpoint, data, event=event, **kwargs)
+            try:
+                response = self.requester.request(**request_kwargs)
+            except RequestException as exc:
+                delay = self._get_retry_delay(method, attempt, exception=exc)
+                if delay is None:
+                    raise
+            else:
+                delay = self._get_retry_delay(
+                    method, attempt, response=response,
+                    handle_status_codes=handle_status_codes
+                )
+                if delay is None:
+                    break
+                # release the connection of a streamed response
+                response.close()
+            self._emit_retry(event, delay)
+            self.retry.sleep(delay)
+            attempt += 1
+            self.requester.tracer.current_span().set_attribute(
+                'wordpress.retry_count', attempt)
 
         return response
 
     # TODO add kwargs option for headers
 
-    def get(self, endpoint, **kwargs):
-        """ Get requests """
-        return self.__request("GET", endpoint, None, **kwargs)
+    @classmethod
+    def get_fields_endpoint(cls, endpoint, fields=None, embed=None):
+        """
+        Add the _fields and _embed params for the fields and embed arguments
+        of get to endpoint, so that they are signed like any other param.
+        """
+        if fields:
+            if not isinstance(fields, string_types):
+                fields = ','.join(fields)
+            endpoint = UrlUtils.set_query_singular(endpoint, '_fields', fields)
+        if embed:
+            if embed is True:
+                embed = '1'
+            elif not isinstance(embed, string_types):
+                embed = ','.join(embed)
+            endpoint = UrlUtils.set_query_singular(endpoint, '_embed', embed)
+        return endpoint
+
+    @classmethod
+    def get_projection(cls, fields=None, embed=None):
+        """
+        Fields to project responses to when the server ignores _fields, or
+        None.
+        """
+        if not fields:
+            return None
+        if isinstance(fields, string_types):
+            fields = fields.split(',')
+        projection = [field.strip() for field in fields]
+        if embed:
+            projection += ['_links', '_embedded']
+        return projection
+
+    def get(self, endpoint, fields=None, embed=None, **kwargs):
+        """
+        Get requests
+
+        `fields` (e.g. ['id', 'modified']) only requests the given fields of
+        the objects with the _fields param and `embed` (True or a list of
+        link relations) embeds linked objects with the _embed param. The
+        response is projected to the fields if the server ignores them.
+
+        With stream=True the body is not downloaded up front, so that a large
+        JSON array can be decoded item by item with response.iter_json().
+        """
+        endpoint = self.get_fields_endpoint(endpoint, fields, embed)
+        response = self.__request("GET", endpoint, None, **kwargs)
+        projection = self.get_projection(fields, embed)
+        if projection:
+            response.projection = projection
+        return response
 
     def post(self, endpoint, data, **kwargs):
         """ POST requests """
@@ -256,3 +513,357 @@ class API(object):
     def options(self, endpoint, **kwargs):
         """ OPTIONS requests """
         return self.__request("OPTIONS", endpoint, None, **kwargs)
+
+    def upload_media(
+        self, source, filename=None, mime_type=None, endpoint='media',
+        progress=None, use_mmap=False, chunk_size=64 * 1024, **kwargs
+    ):
+        """
+        POST a file to the media endpoint, streaming it from disk instead of
+        reading it into memory.
+
+        `source` is a path or a binary file object. The filename defaults to
+        the basename of the file and the mime type is guessed from the
+        filename. `progress(bytes_sent, total_bytes)` is called as the file
+        is sent. With `use_mmap` the file is memory-mapped.
+        """
+        upload = MediaUpload(source, filename, mime_type, use_mmap)
+        try:
+            headers = upload.get_headers()
+            headers.update(kwargs.pop('headers', {}))
+            return self.post(
+                endpoint, upload.get_reader(progress, chunk_size),
+                headers=headers, **kwargs
+            )
+        finally:
+            upload.close()
+
+    # stored in the description of uploaded media to find them by content
+    media_digest_marker = 'sha256:%s'
+
+    def find_media(self, digest, endpoint='media'):
+        """
+        Id of the media uploaded by upload_media_many with the given sha256
+        digest, or None if it is not on the site.
+        """
+        response = self.get(self.get_media_search_endpoint(digest, endpoint))
+        return self.get_media_id(response.json(), digest)
+
+    @classmethod
+    def get_media_search_endpoint(cls, digest, endpoint='media'):
+        marker = cls.media_digest_marker % digest
+        endpoint = UrlUtils.add_query(endpoint, 'search', marker)
+        return UrlUtils.add_query(endpoint, '_fields', 'id,description')
+
+    @classmethod
+    def get_media_id(cls, items, digest):
+        """ Id of the item of a media search marked with digest, or None """
+        marker = cls.media_digest_marker % digest
+        for item in items:
+            if marker in json.dumps(item.get('description')):
+                return item['id']
+        return None
+
+    @classmethod
+    def get_media_upload_endpoint(cls, digest, endpoint='media'):
+        return UrlUtils.add_query(
+            endpoint, 'description', cls.media_digest_marker % digest)
+
+    def get_media_digest(self, path):
+        try:
+            return MediaUpload.get_digest(path)
+        except (IOError, OSError) as exc:
+            self.logger.warning("can't read %s: %s" % (path, exc))
+            return None
+
+    @classmethod
+    def get_unique_media(cls, paths, digests):
+        """ OrderedDict of the first path of each readable digest """
+        unique_paths = OrderedDict()
+        for path, digest in zip(paths, digests):
+            if digest is not None:
+                unique_paths.setdefault(digest, path)
+        return unique_paths
+
+    def upload_media_many(
+        self, paths, workers=None, index=None, search=True, attempts=3,
+        endpoint='media', **kwargs
+    ):
+        """
+        Upload many files with up to `workers` threads, skipping files that
+        were already uploaded, and return an OrderedDict of the attachment
+        id of each path (None for files that failed to upload).
+
+        Files are identified by their sha256 digest, which is looked up in
+        `index` (an UploadIndex or the path of its file) and, if `search`
+        is set, on the site through the media search: the digest is stored
+        in the description of the media uploaded here. Files with the same
+        content are only uploaded once. Each file is tried up to `attempts`
+        times, searching for it again before every retry so that an upload
+        which succeeded without a response isn't duplicated.
+        """
+        if workers is None:
+            workers = self.workers
+        index = UploadIndex.from_value(index)
+        paths = list(paths)
+
+        def upload(item):
+            digest, path = item
+            return digest, self.__upload_unique_media(
+                path, digest, index, search, attempts, endpoint, **kwargs)
+
+        executor = self.executor
+        if executor is None and workers > 1:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        map_ = executor.map if executor is not None else map
+        try:
+            digests = list(map_(self.get_media_digest, paths))
+            unique_paths = self.get_unique_media(paths, digests)
+            media_ids = dict(map_(upload, unique_paths.items()))
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+
+        return OrderedDict(
+            (path, media_ids.get(digest))
+            for path, digest in zip(paths, digests)
+        )
+
+    def __upload_unique_media(
+        self, path, digest, index, search, attempts, endpoint, **kwargs
+    ):
+        media_id = index.get(digest)
+        if media_id is not None:
+            return media_id
+        retry = self.retry or RetryPolicy()
+        for attempt in range(attempts):
+            try:
+                if search:
+                    media_id = self.find_media(digest, endpoint)
+                if media_id is None:
+                    response = self.upload_media(
+                        path,
+                        endpoint=self.get_media_upload_endpoint(
+                            digest, endpoint),
+                        **kwargs
+                    )
+                    media_id = response.json()['id']
+                index.set(digest, media_id)
+                return media_id
+            except (
+                RequestException, UserWarning, ValueError, KeyError
+            ) as exc:
+                self.logger.warning(
+                    "uploading %s failed (attempt %d): %s" % (
+                        path, attempt + 1, exc))
+            if attempt + 1 < attempts:
+                retry.sleep(retry.get_backoff(attempt))
+        return None
+
+    batch_actions = ['create', 'update', 'delete']
+
+    def batch(
+        self, endpoint, create=None, update=None, delete=None, chunk_size=100,
+        workers=None, **kwargs
+    ):
+        """
+        Create, update and delete many objects through a WooCommerce batch
+        endpoint like `products/batch`.
+
+        The objects are split into requests of at most `chunk_size` objects,
+        which are sent by up to `workers` threads. The per-object results
+        (including per-object errors) of every request are merged into a
+        single response dict of the same shape as the batch endpoint's.
+        """
+        if workers is None:
+            workers = self.workers
+        endpoint = self.get_batch_endpoint(endpoint)
+        payloads = self.get_batch_payloads(create, update, delete, chunk_size)
+
+        def post_batch(payload):
+            return self.post(endpoint, payload, **kwargs).json()
+
+        if workers > 1 and len(payloads) > 1:
+            executor = self.executor or ThreadPoolExecutor(max_workers=workers)
+            try:
+                results = list(executor.map(post_batch, payloads))
+            finally:
+                if executor is not self.executor:
+                    executor.shutdown()
+        else:
+            results = [post_batch(payload) for payload in payloads]
+
+        return self.merge_batch_results(results)
+
+    @classmethod
+    def get_batch_endpoint(cls, endpoint):
+        if not StrUtils.remove_tail(endpoint, '/').endswith('batch'):
+            endpoint = UrlUtils.join_components([endpoint, 'batch'])
+        return endpoint
+
+    @classmethod
+    def get_batch_payloads(cls, create, update, delete, chunk_size):
+        """ Split the objects of a batch into payloads of chunk_size """
+        operations = []
+        for action, objects in zip(
+            cls.batch_actions, [create, update, delete]
+        ):
+            operations += [(action, obj) for obj in (objects or [])]
+
+        payloads = []
+        for chunk in SeqUtils.chunks(operations, chunk_size):
+            payload = OrderedDict()
+            for action, obj in chunk:
+                payload.setdefault(action, []).append(obj)
+            payloads.append(payload)
+        return payloads
+
+    @classmethod
+    def merge_batch_results(cls, results):
+        """ Merge the responses of the payloads of a batch in order """
+        merged = OrderedDict()
+        for result in results:
+            for action in cls.batch_actions:
+                if action in result:
+                    merged.setdefault(action, []).extend(result[action])
+        return merged
+
+    total_pages_headers = ['X-WP-TotalPages', 'X-WC-TotalPages']
+
+    def get_total_pages(self, response):
+        """
+        Return the total number of pages reported by the response headers,
+        or None if the endpoint does not report it.
+        """
+        for header in self.total_pages_headers:
+            try:
+                return int(response.headers[header])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    def get_next_endpoint(self, response, endpoint, page):
+        """
+        Determine the endpoint of the page after `page` given its response.
+
+        The `next` Link header is followed if it points to this API,
+        otherwise the page count headers are used. Returns None on the last
+        page.
+        """
+        next_link = response.links.get('next', {}).get('url')
+        if next_link:
+            next_link = UrlUtils.remove_auth_params(next_link)
+            for api_ver_url in [
+                self.requester.api_ver_url,
+                self.requester.api_ver_url_no_port
+            ]:
+                if next_link.startswith(api_ver_url):
+                    return StrUtils.decapitate(next_link, api_ver_url)
+        total_pages = self.get_total_pages(response)
+        if next_link or (total_pages is not None and page < total_pages):
+            return UrlUtils.set_query_singular(endpoint, 'page', page + 1)
+
+    @classmethod
+    def get_page_items(cls, response_json):
+        """
+        Extract the list of items from a decoded collection response.
+
+        Legacy wc-api responses wrap the list in a single key like
+        {"products": [...]}.
+        """
+        if isinstance(response_json, dict):
+            lists = [
+                value for value in response_json.values()
+                if isinstance(value, list)
+            ]
+            if len(lists) == 1:
+                return lists[0]
+            return []
+        return response_json or []
+
+    def iter_pages(
+        self, endpoint, per_page=100, prefetch=True, workers=None, **kwargs
+    ):
+        """
+        Lazily GET every page of a collection endpoint, yielding responses.
+
+        While a page is being consumed, the following page is fetched in a
+        background thread unless `prefetch` is False. If `workers` is
+        greater than 1 and the first page reports the total number of pages,
+        the remaining pages are fetched concurrently by up to `workers`
+        threads and still yielded in page order. Each page request is
+        signed separately, so every page gets a fresh nonce and timestamp.
+        Other arguments, like `fields` and `embed`, are passed to get.
+        """
+        if workers is None:
+            workers = self.workers
+        if per_page:
+            endpoint = UrlUtils.set_query_singular(
+                endpoint, 'per_page', per_page)
+        page = int(UrlUtils.get_query_singular(endpoint, 'page', 1))
+
+        executor = self.executor
+        owns_executor = executor is None and (prefetch or workers > 1)
+        if owns_executor:
+            executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+        try:
+            response = self.get(endpoint, **kwargs)
+            total_pages = self.get_total_pages(response)
+            if workers > 1 and total_pages is not None:
+                yield response
+                for response in self.__iter_pages_concurrently(
+                    executor, workers, endpoint, page + 1, total_pages,
+                    **kwargs
+                ):
+                    yield response
+                return
+            while response is not None:
+                next_endpoint = self.get_next_endpoint(response, endpoint, page)
+                future = None
+                if next_endpoint is not None and prefetch:
+                    future = executor.submit(self.get, next_endpoint, **kwargs)
+                yield response
+                if next_endpoint is None:
+                    break
+                if future is not None:
+                    response = future.result()
+                else:
+                    response = self.get(next_endpoint, **kwargs)
+                endpoint = next_endpoint
+                page += 1
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=False)
+
+    def __iter_pages_concurrently(
+        self, executor, workers, endpoint, first_page, last_page, **kwargs
+    ):
+        """
+        Fetch pages first_page to last_page with executor, yielding responses
+        in page order. At most 2 * workers pages are in flight or buffered.
+        """
+        pending = deque()
+        next_page = first_page
+        try:
+            while pending or next_page <= last_page:
+                while next_page <= last_page and len(pending) < 2 * workers:
+                    page_endpoint = UrlUtils.set_query_singular(
+                        endpoint, 'page', next_page)
+                    pending.append(
+                        executor.submit(self.get, page_endpoint, **kwargs))
+                    next_page += 1
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def iter_items(self, endpoint, per_page=100, **kwargs):
+        """
+        Lazily GET every item of a collection endpoint across all pages,
+        yielding decoded items one at a time.
+        """
+        for response in self.iter_pages(endpoint, per_page, **kwargs):
+            items = self.get_page_items(response.json())
+            if not items:
+                break
+            for item in items:
+                yield item
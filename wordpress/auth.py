@@ -10,6 +10,7 @@ import binascii
 import json
 import logging
 import os
+from bisect import bisect_right
 from collections import OrderedDict
 from hashlib import sha1, sha256
 from hmac import new as HMAC
@@ -20,11 +21,11 @@ from time import time
 import requests
 from requests.auth import HTTPBasicAuth
 
-from bs4 import BeautifulSoup
-from six.moves.urllib.parse import parse_qs, parse_qsl, quote, urlparse
+from six.moves.urllib.parse import (parse_qs, parse_qsl, quote, urlparse,
+                                    urlunparse)
 from wordpress import __version__
 
-from .helpers import StrUtils, UrlUtils
+from .helpers import LazyUserWarning, StrUtils, UrlUtils
 
 
 class Auth(object):
@@ -131,41 +132,67 @@ class OAuth(Auth):
         Sign the url with sign_key if provided, otherwise generate
         sign_key automatically and return a signed url.
         """
-        if isinstance(params, dict):
-            params = list(params.items())
-
-        urlparse_result = urlparse(url)
-
-        if urlparse_result.query:
-            params += parse_qsl(urlparse_result.query)
-            # for key, value in parse_qsl(urlparse_result.query):
-            #     params += [(key, value)]
-
-        # headers = kwargs.get('headers', {})
-        # if headers:
-        #     params += headers.items()
-
-        params = UrlUtils.unique_params(params)
-        params = UrlUtils.sorted_params(params)
-
-        params_without_signature = []
-        for key, value in params:
-            if key != "oauth_signature":
-                params_without_signature.append((key, value))
-
-        self.logger.debug('sorted_params before sign: %s' %
-                          pformat(params_without_signature))
-
-        signature = self.generate_oauth_signature(
-            method, params_without_signature, url, sign_key)
-
-        self.logger.debug('signature: %s' % signature)
+        with self.requester.tracer.span(
+            'wordpress.sign', {'http.method': method.upper()}
+        ):
+            if isinstance(params, dict):
+                params = list(params.items())
+
+            urlparse_result = urlparse(url)
+
+            if urlparse_result.query:
+                params += parse_qsl(urlparse_result.query)
+                # for key, value in parse_qsl(urlparse_result.query):
+                #     params += [(key, value)]
+
+            # headers = kwargs.get('headers', {})
+            # if headers:
+            #     params += headers.items()
+
+            params = UrlUtils.unique_params(params)
+            params = UrlUtils.sorted_params(params)
+
+            params_without_signature = []
+            for key, value in params:
+                if key != "oauth_signature":
+                    params_without_signature.append((key, value))
+
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug('sorted_params before sign: %s' %
+                                  pformat(params_without_signature))
+
+            # Normalize and sort the params once, the signed query string is
+            # the same as the one in the base string with the signature
+            # inserted.
+            normalized_params = UrlUtils.sorted_params(
+                UrlUtils.normalize_params(params_without_signature))
+            query_string = "&".join([
+                "%s=%s" % (key, value) for key, value in normalized_params
+            ])
+
+            signature = self.sign_string(
+                self.join_signature_base_string(method, url, query_string),
+                sign_key
+            )
 
-        params = params_without_signature + [("oauth_signature", signature)]
+            self.logger.debug('signature: %s' % signature)
 
-        query_string = UrlUtils.flatten_params(params)
+            signature_key, signature_value = UrlUtils.normalize_params(
+                [("oauth_signature", signature)])[0]
+            position = bisect_right(
+                [
+                    (key.split('[')[0], value)
+                    for key, value in normalized_params
+                ],
+                (signature_key.split('[')[0], signature_value)
+            )
+            normalized_params.insert(
+                position, (signature_key, signature_value))
+            query_string = "&".join([
+                "%s=%s" % (key, value) for key, value in normalized_params
+            ])
 
-        return UrlUtils.substitute_query(url, query_string)
+            return urlunparse(urlparse_result._replace(query=query_string))
 
     def get_params(self):
         return [
@@ -181,26 +208,59 @@ class OAuth(Auth):
 
         return self.add_params_sign(method, endpoint_url, params, **kwargs)
 
+    # percent encoded base string URIs by the parts of the url they use
+    base_request_uris = {}
+    base_request_uris_max = 1024
+
     @classmethod
-    def get_signature_base_string(cls, method, params, url):
-        # remove default port
-        url = UrlUtils.remove_default_port(url)
-        # ensure scheme is lowercase
-        url = UrlUtils.lower_scheme(url)
-        # remove query string parameters
-        url = UrlUtils.substitute_query(url)
-        base_request_uri = quote(url, "")
-        query_string = UrlUtils.flatten_params(params)
-        query_string = quote(query_string, '~')
+    def get_base_request_uri(cls, url):
+        """
+        Return the percent encoded base string URI of the url, which only
+        depends on the endpoint so it is cached.
+        """
+        urlparse_result = urlparse(url)
+        cache_key = urlparse_result._replace(query='')
+        base_request_uri = cls.base_request_uris.get(cache_key)
+        if base_request_uri is None:
+            # remove default port
+            url = UrlUtils.remove_default_port(url)
+            # ensure scheme is lowercase
+            url = UrlUtils.lower_scheme(url)
+            # remove query string parameters
+            url = UrlUtils.substitute_query(url)
+            base_request_uri = quote(url, "")
+            if len(cls.base_request_uris) >= cls.base_request_uris_max:
+                cls.base_request_uris.clear()
+            cls.base_request_uris[cache_key] = base_request_uri
+        return base_request_uri
+
+    @classmethod
+    def join_signature_base_string(cls, method, url, query_string):
+        """
+        Join the method, url and flattened (normalized and sorted) query
+        string into the signature base string.
+        """
         return "%s&%s&%s" % (
-            method.upper(), base_request_uri, query_string
+            method.upper(),
+            cls.get_base_request_uri(url),
+            quote(query_string, '~')
         )
 
+    @classmethod
+    def get_signature_base_string(cls, method, params, url):
+        query_string = UrlUtils.flatten_params(params)
+        return cls.join_signature_base_string(method, url, query_string)
+
     def generate_oauth_signature(self, method, params, url, key=None):
         """ Generate OAuth Signature """
 
         string_to_sign = self.get_signature_base_string(method, params, url)
 
+        return self.sign_string(string_to_sign, key)
+
+    def sign_string(self, string_to_sign, key=None):
+        """ Sign the signature base string with key """
+
         if key is None:
             key = self.get_sign_key(self.consumer_secret)
 
@@ -234,7 +294,7 @@ class OAuth(Auth):
         """ Generate nonce number """
         if cls.force_nonce is not None:
             return cls.force_nonce
-        nonce = ''.join([str(randint(0, 9)) for i in range(8)])
+        nonce = '%08d' % randint(0, 99999999)
         return HMAC(
             nonce.encode(),
             "secret".encode(),
@@ -396,21 +456,21 @@ class OAuth_3Leg(OAuth):
         try:
             self._request_token = resp_content['oauth_token'][0]
         except:
-            raise UserWarning(
+            raise LazyUserWarning(lambda: (
                 "Could not parse request_token in response from %s : %s"
                 % (
                     repr(response.request.url),
                     UrlUtils.beautify_response(response))
-                )
+            ))
         try:
             self.request_token_secret = resp_content['oauth_token_secret'][0]
         except:
-            raise UserWarning(
+            raise LazyUserWarning(lambda: (
                 "Could not parse request_token_secret in response from %s : %s"
                 % (
                     repr(response.request.url),
                     UrlUtils.beautify_response(response))
-                )
+            ))
 
         return self._request_token, self.request_token_secret
 
@@ -418,6 +478,7 @@ class OAuth_3Leg(OAuth):
         """
         If unable to parse login form, try to determine which error is present
         """
+        from bs4 import BeautifulSoup
         login_form_soup = BeautifulSoup(response.text, 'lxml')
         if response.status_code == 500:
             error = login_form_soup.select_one('body#error-page')
@@ -461,6 +522,7 @@ class OAuth_3Leg(OAuth):
                 response.status_code,
                 response.text
             )
+        from bs4 import BeautifulSoup
         response_soup = BeautifulSoup(response.text, "lxml")
         form_soup = response_soup.select_one('form#%s' % form_id)
         assert \
@@ -690,13 +752,13 @@ class OAuth_3Leg(OAuth):
             self.access_token_secret = \
                 access_response_queries['oauth_token_secret'][0]
         except:
-            raise UserWarning(
+            raise LazyUserWarning(lambda: (
                 "Could not parse access_token or access_token_secret in "
                 "response from %s : %s"
                 % (
                     repr(access_response.request.url),
                     UrlUtils.beautify_response(access_response))
-                )
+            ))
 
         self.store_access_creds()
 
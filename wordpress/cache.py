@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Cache Classes
+"""
+
+__title__ = "wordpress-cache"
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from six.moves.urllib.parse import parse_qsl, urlparse
+from wordpress.helpers import JsonUtils, StrUtils, UrlUtils
+from wordpress.response import APIResponse
+
+
+class ResponseCache(object):
+    """
+    Boilerplate for caching GET responses so that they can be revalidated
+    with If-None-Match / If-Modified-Since and served from the cache when the
+    server replies 304 Not Modified.
+
+    Entries are dicts with the status_code, headers, encoding and content
+    of a response. Subclasses provide the storage.
+    """
+
+    # added by OAuth on every request, so they are not part of the key.
+    volatile_params = ['oauth_nonce', 'oauth_timestamp', 'oauth_signature']
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create a cache from the `cache` option of the requester, which can be
+        a ResponseCache, True for an in-memory cache or None for no cache.
+        """
+        if value is True:
+            return MemoryCache()
+        return value or None
+
+    @classmethod
+    def get_key(cls, url):
+        """
+        Key for a request url, ignoring the per-request OAuth params. The key
+        is hashed because the url can contain credentials.
+        """
+        url = UrlUtils.canonical_url(url, cls.volatile_params)
+        return sha256(StrUtils.to_binary(url)).hexdigest()
+
+    @classmethod
+    def get_validators(cls, entry):
+        """ Conditional request headers to revalidate a cache entry """
+        headers = CaseInsensitiveDict(entry['headers'])
+        validators = OrderedDict()
+        if 'ETag' in headers:
+            validators['If-None-Match'] = headers['ETag']
+        if 'Last-Modified' in headers:
+            validators['If-Modified-Since'] = headers['Last-Modified']
+        return validators
+
+    @classmethod
+    def is_cacheable(cls, response):
+        headers = response.headers
+        if response.status_code != 200:
+            return False
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return False
+        return 'ETag' in headers or 'Last-Modified' in headers
+
+    @classmethod
+    def entry_from_response(cls, response):
+        return dict(
+            status_code=response.status_code,
+            headers=list(response.headers.items()),
+            encoding=response.encoding,
+            content=response.content,
+        )
+
+    @classmethod
+    def response_from_entry(cls, entry, not_modified):
+        """
+        Build the response for a cache entry that the server confirmed with
+        the not_modified (304) response.
+        """
+        headers = CaseInsensitiveDict(entry['headers'])
+        for key in ['Date', 'ETag', 'Expires', 'Cache-Control']:
+            if key in not_modified.headers:
+                headers[key] = not_modified.headers[key]
+        response = Response()
+        response.status_code = entry['status_code']
+        response.headers = headers
+        response.encoding = entry['encoding']
+        response._content = entry['content']
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.reason = 'OK'
+        response.from_cache = True
+        return response
+
+    def get(self, key):
+        """ Return the entry stored at key or None """
+        raise NotImplementedError()
+
+    def set(self, key, entry):
+        """ Store an entry at key """
+        raise NotImplementedError()
+
+    def delete(self, key):
+        """ Remove the entry stored at key if any """
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory cache evicting the least recently used entries once the total
+    size of the cached content exceeds max_size bytes.
+    """
+
+    def __init__(self, max_size=64 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.entries[key] = entry
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry['content'])
+        if size > self.max_size:
+            return
+        with self.lock:
+            old_entry = self.entries.pop(key, None)
+            if old_entry is not None:
+                self.size -= len(old_entry['content'])
+            self.entries[key] = entry
+            self.size += size
+            while self.size > self.max_size:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted['content'])
+
+    def delete(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry['content'])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache in a sqlite database evicting the least recently used
+    entries once the total size of the cached content exceeds max_size bytes.
+    """
+
+    def __init__(self, path, max_size=512 * 1024 * 1024):
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " status_code INTEGER,"
+                " headers TEXT,"
+                " encoding TEXT,"
+                " content BLOB,"
+                " size INTEGER,"
+                " accessed REAL"
+                ")"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed)"
+            )
+
+    def get(self, key):
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT status_code, headers, encoding, content "
+                "FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                (time.time(), key)
+            )
+        status_code, headers, encoding, content = row
+        return dict(
+            status_code=status_code,
+            headers=json.loads(headers),
+            encoding=encoding,
+            content=bytes(content),
+        )
+
+    def set(self, key, entry):
+        size = len(entry['content'])
+        if size > self.max_size:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, entry['status_code'], json.dumps(entry['headers']),
+                    entry['encoding'], sqlite3.Binary(entry['content']), size,
+                    time.time()
+                )
+            )
+            total_size, = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total_size <= self.max_size:
+                return
+            for evicted_key, evicted_size in self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"
+            ).fetchall():
+                if total_size <= self.max_size:
+                    break
+                self.connection.execute(
+                    "DELETE FROM responses WHERE key = ?", (evicted_key,))
+                total_size -= evicted_size
+
+    def delete(self, key):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+
+
+class EntityCache(object):
+    """
+    In-process cache of decoded objects (products, customers, posts...) by
+    resource and id, evicting entries after `ttl` seconds and the least
+    recently used entries beyond `max_entries`.
+
+    API populates it from the items of collection and single item GET
+    responses, serves single item GETs from it, and invalidates the objects
+    written by POST / PUT / DELETE requests. Objects are stored encoded so
+    that callers modifying a decoded object can't alter the cache.
+    """
+
+    # params changing the representation of the objects in a response
+    partial_params = ['_fields', '_embed', 'context']
+
+    def __init__(self, ttl=60, max_entries=10000, clock=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock or time.time
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create a cache from the `entity_cache` option of API, which can be an
+        EntityCache, True for the default cache or None for no cache.
+        """
+        if value is True:
+            return cls()
+        return value or None
+
+    @classmethod
+    def parse_endpoint(cls, endpoint):
+        """
+        Split an endpoint like products/123?context=view into its resource,
+        the id of the object it refers to (or None for collections and
+        other endpoints) and its query params.
+        """
+        parsed = urlparse(endpoint)
+        path = parsed.path.strip('/')
+        resource, _, item_id = path.rpartition('/')
+        if resource and item_id.isdigit():
+            return resource, int(item_id), parse_qsl(parsed.query)
+        return path, None, parse_qsl(parsed.query)
+
+    def get(self, resource, item_id):
+        """ Return the encoded object or None """
+        key = (resource, item_id)
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return None
+            expires, content = entry
+            if expires < self.clock():
+                return None
+            self.entries[key] = entry
+            return content
+
+    def set(self, resource, item_id, content):
+        """ Store an encoded object """
+        key = (resource, item_id)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (self.clock() + self.ttl, content)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, resource, item_id=None):
+        """ Remove an object, or all the objects of resource if no item_id """
+        with self.lock:
+            if item_id is not None:
+                self.entries.pop((resource, item_id), None)
+                return
+            for key in [key for key in self.entries if key[0] == resource]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_response(self, method, endpoint, url):
+        """
+        Build the response to a single item GET from the cache, or return
+        None if it isn't cached.
+        """
+        if method.upper() != 'GET':
+            return None
+        resource, item_id, params = self.parse_endpoint(endpoint)
+        if item_id is None or params:
+            return None
+        content = self.get(resource, item_id)
+        if content is None:
+            return None
+        response = APIResponse()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict({
+            'Content-Type': 'application/json; charset=UTF-8'})
+        response.encoding = 'utf-8'
+        response._content = content
+        response.url = url
+        response.from_cache = True
+        return response
+
+    def update(self, method, endpoint, response):
+        """
+        Store the objects of a GET response, or invalidate the objects
+        written by any other request.
+        """
+        resource, item_id, params = self.parse_endpoint(endpoint)
+        if method.upper() != 'GET':
+            if item_id is None and resource.endswith('/batch'):
+                self.invalidate(resource[:-len('/batch')])
+            elif item_id is not None:
+                self.invalidate(resource, item_id)
+            return
+        if response is None or response.status_code != 200:
+            return
+        if response._content is False:
+            # don't read streamed responses
+            return
+        if any(key in self.partial_params for key, _ in params):
+            return
+        if item_id is not None:
+            self.set(resource, item_id, response.content)
+            return
+        try:
+            items = response.json()
+        except ValueError:
+            return
+        if not isinstance(items, list):
+            return
+        for item in items:
+            if isinstance(item, dict) and 'id' in item:
+                self.set(resource, item['id'], JsonUtils.dumps(item))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Request Coalescing Classes
+"""
+
+__title__ = "wordpress-coalesce"
+
+import threading
+
+
+class Flight(object):
+    """ A call in progress, whose outcome is shared with its followers """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical calls made concurrently by several threads: the
+    first caller of a key (the leader) runs the call while the others wait
+    for its outcome, so only one call is in flight per key at a time.
+
+    Followers get `copy(result)` so that they don't share mutable state with
+    the leader.
+    """
+
+    def __init__(self, copy=None):
+        self.copy = copy or (lambda result: result)
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    @classmethod
+    def from_value(cls, value, copy=None):
+        """
+        Create a group from the `coalesce` option of API, which can be a
+        SingleFlight, True or None for no coalescing.
+        """
+        if value is True:
+            return cls(copy)
+        return value or None
+
+    def do(self, key, function):
+        """ Call function unless a call for key is in progress """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return self.copy(flight.result)
+        try:
+            flight.result = function()
+            return flight.result
+        except Exception as exc:
+            flight.exception = exc
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def in_flight(self):
+        """ Number of calls in progress """
+        with self.lock:
+            return len(self.flights)
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Fake Server Classes
+"""
+
+__title__ = "wordpress-fake"
+
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from requests import Request, Response
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from six.moves import http_client
+from six.moves.urllib.parse import parse_qsl, urlencode, urlparse
+
+from wordpress.helpers import StrUtils, UrlUtils
+from wordpress.transport import API_Requests_Wrapper
+
+
+class FakeServer(object):
+    """
+    Deterministic in-memory WordPress / WooCommerce REST API for tests and
+    load tests without network.
+
+    Collections are created on the first write and are addressed by their
+    path, so products/12/variations is a collection of its own. Supported
+    routes are the list (paginated, with X-WP-Total, X-WP-TotalPages and Link
+    headers), create, read, update and delete of items and WooCommerce
+    batch endpoints. Lists are ordered by id and can be filtered with
+    `list_filters`, include, search and modified_after / modified_before
+    (compared with the local dates unless dates_are_gmt is true).
+
+    `latency` is a number of seconds or a (min, max) range added to every
+    request, `error_rate` the share of requests answered with
+    `error_status` and `connection_error_rate` the share of requests
+    failing with a ConnectionError. The latency and errors are drawn from a
+    random generator seeded with `seed`, so a sequence of requests always
+    gets the same answers.
+    """
+
+    default_per_page = 10
+    max_per_page = 100
+    list_filters = ['slug', 'sku', 'status', 'parent', 'type']
+    gmt_date_fields = ['modified_gmt', 'date_modified_gmt']
+    local_date_fields = ['modified', 'date_modified']
+
+    def __init__(
+        self, latency=0, error_rate=0, error_status=503,
+        connection_error_rate=0, seed=0, sleep=time.sleep
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.connection_error_rate = connection_error_rate
+        self.random = random.Random(seed)
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.last_ids = {}
+        self.request_count = 0
+
+    def transport(self, url, **kwargs):
+        """ Transport factory for the `transport` argument of API """
+        return FakeTransport(url, server=self, **kwargs)
+
+    def get_collection(self, collection):
+        collection = collection.strip('/')
+        if collection not in self.collections:
+            self.collections[collection] = OrderedDict()
+            self.last_ids[collection] = 0
+        return self.collections[collection]
+
+    def add_items(self, collection, items):
+        """
+        Store items in collection, giving the ones without an id the next
+        ids. Returns the stored items.
+        """
+        with self.lock:
+            return [self.store_item(collection, item) for item in items]
+
+    def store_item(self, collection, item):
+        items = self.get_collection(collection)
+        collection = collection.strip('/')
+        item = dict(item)
+        if item.get('id') is None:
+            item['id'] = self.last_ids[collection] + 1
+        self.last_ids[collection] = max(self.last_ids[collection], item['id'])
+        items[item['id']] = item
+        return item
+
+    def get_items(self, collection):
+        """ Copy of the items of collection """
+        with self.lock:
+            return list(self.get_collection(collection).values())
+
+    def get_latency(self):
+        if isinstance(self.latency, (list, tuple)):
+            return self.random.uniform(*self.latency)
+        return self.latency
+
+    @classmethod
+    def error(cls, status, code, message):
+        return status, {}, {
+            'code': code, 'message': message, 'data': {'status': status}
+        }
+
+    @classmethod
+    def get_item_date(cls, item, gmt=False):
+        """
+        Local modification date of item like WordPress, or its GMT date for
+        WooCommerce requests with dates_are_gmt
+        """
+        for field in cls.gmt_date_fields if gmt else cls.local_date_fields:
+            if item.get(field):
+                return item[field][:19]
+        return None
+
+    def filter_items(self, items, params):
+        for key in self.list_filters:
+            if key in params:
+                items = [
+                    item for item in items
+                    if StrUtils.to_text(item.get(key)) == params[key]
+                ]
+        if params.get('include'):
+            ids = [int(item_id) for item_id in params['include'].split(',')]
+            items = [item for item in items if item['id'] in ids]
+        if params.get('search'):
+            search = params['search'].lower()
+            items = [
+                item for item in items if any(
+                    search in StrUtils.to_text(item.get(field)).lower()
+                    for field in ['name', 'title', 'slug', 'sku']
+                    if item.get(field)
+                )
+            ]
+        gmt = params.get('dates_are_gmt') == 'true'
+        for key, keep in [
+            ('modified_after', lambda date, since: date > since),
+            ('modified_before', lambda date, until: date < until),
+        ]:
+            if params.get(key):
+                items = [
+                    item for item in items
+                    if self.get_item_date(item, gmt) is not None
+                    and keep(self.get_item_date(item, gmt), params[key][:19])
+                ]
+        return items
+
+    def list_items(self, url, collection, params):
+        try:
+            per_page = int(params.get('per_page', self.default_per_page))
+            page = int(params.get('page', 1))
+        except ValueError:
+            return self.error(400, 'rest_invalid_param', 'Invalid parameter.')
+        if not 1 <= per_page <= self.max_per_page or page < 1:
+            return self.error(400, 'rest_invalid_param', 'Invalid parameter.')
+        items = self.filter_items(
+            list(self.get_collection(collection).values()), params)
+        if params.get('order') == 'desc':
+            items.reverse()
+        total = len(items)
+        total_pages = int(math.ceil(total / float(per_page)))
+        if page > 1 and page > total_pages:
+            return self.error(
+                400, 'rest_post_invalid_page_number',
+                'The page number requested is larger than the number of '
+                'pages available.'
+            )
+        headers = {
+            'X-WP-Total': str(total),
+            'X-WP-TotalPages': str(total_pages),
+        }
+        links = []
+        for rel, link_page in [('prev', page - 1), ('next', page + 1)]:
+            if 1 <= link_page <= total_pages:
+                links.append('<%s>; rel="%s"' % (
+                    UrlUtils.set_query_singular(url, 'page', link_page), rel))
+        if links:
+            headers['Link'] = ', '.join(links)
+        start = (page - 1) * per_page
+        return 200, headers, items[start:start + per_page]
+
+    def write_item(self, method, collection, item_id, data):
+        items = self.get_collection(collection)
+        if item_id is None:
+            if method != 'POST':
+                return self.error(
+                    404, 'rest_no_route',
+                    'No route was found matching the URL and request method.'
+                )
+            data.pop('id', None)
+            return 201, {}, self.store_item(collection, data)
+        if item_id not in items:
+            return self.error(404, 'rest_post_invalid_id', 'Invalid ID.')
+        if method == 'DELETE':
+            return 200, {}, items.pop(item_id)
+        items[item_id].update(data)
+        items[item_id]['id'] = item_id
+        return 200, {}, items[item_id]
+
+    def batch(self, collection, data):
+        result = OrderedDict()
+        for action in ['create', 'update', 'delete']:
+            if action not in data:
+                continue
+            result[action] = []
+            for item in data[action]:
+                if action == 'create':
+                    status, _, body = self.write_item(
+                        'POST', collection, None, dict(item))
+                elif action == 'update':
+                    status, _, body = self.write_item(
+                        'PUT', collection, item.get('id'), dict(item))
+                else:
+                    status, _, body = self.write_item(
+                        'DELETE', collection, item, {})
+                if status >= 400:
+                    body = {'id': item if action == 'delete' else
+                            item.get('id', 0), 'error': body}
+                result[action].append(body)
+        return 200, {}, result
+
+    def route(self, method, url, path, params, data):
+        segments = path.strip('/').split('/')
+        if segments[-1] == 'batch' and method in ['POST', 'PUT']:
+            return self.batch('/'.join(segments[:-1]), data)
+        item_id = None
+        if len(segments) > 1 and segments[-1].isdigit():
+            item_id = int(segments.pop())
+        collection = '/'.join(segments)
+        if method == 'GET' and item_id is None:
+            return self.list_items(url, collection, params)
+        if method == 'GET':
+            items = self.get_collection(collection)
+            if item_id not in items:
+                return self.error(404, 'rest_post_invalid_id', 'Invalid ID.')
+            return 200, {}, items[item_id]
+        return self.write_item(method, collection, item_id, data)
+
+    def handle(self, method, url, path, params, data):
+        """
+        Answer a request for path (relative to the api version) after the
+        latency, returning the status code, headers, JSON encoded body and
+        latency.
+        """
+        with self.lock:
+            self.request_count += 1
+            latency = self.get_latency()
+            failure = self.random.random()
+            if failure < self.connection_error_rate:
+                status, headers, body = None, None, None
+            else:
+                if failure < self.connection_error_rate + self.error_rate:
+                    status, headers, body = self.error(
+                        self.error_status, 'fake_server_error',
+                        'Simulated server error.')
+                else:
+                    status, headers, body = self.route(
+                        method, url, path, params, data)
+                # serialize now so that later writes can't change the body
+                body = json.dumps(body).encode('utf-8')
+        if latency:
+            self.sleep(latency)
+        if status is None:
+            raise ConnectionError('Simulated connection error to %s' % url)
+        return status, headers, body, latency
+
+
+class FakeTransport(API_Requests_Wrapper):
+    """
+    Transport answering requests with a FakeServer (a new one unless
+    `server` is given) instead of the network. URLs are built and signed as
+    usual, the server ignores the authentication.
+    """
+
+    def __init__(self, url, **kwargs):
+        super(FakeTransport, self).__init__(url, **kwargs)
+        self.server = kwargs.get('server') or FakeServer()
+
+    # query params removed from the urls of the Link headers
+    auth_params = ['consumer_key', 'consumer_secret']
+
+    def send(self, request_kwargs):
+        request = Request(
+            method=request_kwargs['method'].upper(),
+            url=request_kwargs['url'],
+            headers=request_kwargs.get('headers'),
+            data=request_kwargs.get('data'),
+            params=request_kwargs.get('params'),
+            auth=request_kwargs.get('auth'),
+        ).prepare()
+        body = request.body
+        if hasattr(body, 'read'):
+            body = body.read()
+        data = {}
+        content_type = request.headers.get('content-type', '')
+        if body and 'json' in content_type:
+            data = json.loads(StrUtils.to_text(body))
+        elif body:
+            # uploaded media
+            data = {
+                'mime_type': content_type,
+                'media_details': {'filesize': len(body)},
+            }
+
+        parsed = urlparse(request.url)
+        params = OrderedDict(
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if key not in self.auth_params and not key.startswith('oauth_')
+        )
+        url = UrlUtils.substitute_query(request.url, urlencode(params))
+        path = StrUtils.decapitate(
+            parsed.path, urlparse(self.api_ver_url).path)
+        status, headers, body, latency = self.server.handle(
+            request.method, url, path, params, data)
+
+        response = Response()
+        response.status_code = status
+        response.reason = http_client.responses.get(status, '')
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+        response._content = body
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=latency)
+        return response
@@ -6,6 +6,7 @@ Wordpress Hellper Class
 
 __title__ = "wordpress-requests"
 
+import codecs
 import json
 import locale
 import os
@@ -14,7 +15,6 @@ import re
 import sys
 from collections import OrderedDict
 
-from bs4 import BeautifulSoup
 from six import (PY2, PY3, binary_type, iterbytes, string_types, text_type,
                  unichr)
 from six.moves import reduce
@@ -22,6 +22,48 @@ from six.moves.urllib.parse import ParseResult as URLParseResult
 from six.moves.urllib.parse import (parse_qs, parse_qsl, quote, urlencode,
                                     urlparse, urlunparse)
 
+try:
+    import orjson as fast_json
+except ImportError:
+    try:
+        import ujson as fast_json
+    except ImportError:
+        fast_json = None
+
+
+class LazyUserWarning(UserWarning):
+    """
+    UserWarning whose message is only built by get_message when it is
+    formatted, for messages which are expensive to build (e.g. beautified
+    error pages) and may never be read.
+    """
+
+    def __init__(self, get_message):
+        super(LazyUserWarning, self).__init__()
+        self.get_message = get_message
+        self.message = None
+
+    def __str__(self):
+        if self.message is None:
+            self.message = self.get_message()
+        return self.message
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, str(self))
+
+    @property
+    def args(self):
+        # (message,) like UserWarning(message), built when it is read
+        return (str(self),)
+
+    @args.setter
+    def args(self, args):
+        self.message = args[0] if len(args) == 1 else str(args)
+
+    def __reduce__(self):
+        # the message is pickled instead of get_message
+        return type(self), (None,), {'message': str(self)}
+
 
 class StrUtils(object):
     @classmethod
@@ -94,6 +136,127 @@ class BytesJsonEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
+class JsonUtils(object):
+    # fastest installed decoder: orjson, ujson or the standard library.
+    backend = fast_json or json
+
+    @classmethod
+    def loads(cls, data):
+        """ Decode a JSON document given as UTF-8 bytes or text """
+        return cls.backend.loads(data)
+
+    @classmethod
+    def dumps(cls, obj):
+        """ Encode an object as compact UTF-8 JSON bytes """
+        if cls.backend is json:
+            return StrUtils.to_binary(
+                json.dumps(obj, separators=(',', ':'), ensure_ascii=False))
+        return StrUtils.to_binary(cls.backend.dumps(obj))
+
+    whitespace = re.compile(r'[ \t\n\r]*')
+
+    @classmethod
+    def iter_array(cls, chunks, encoding='utf-8'):
+        """
+        Incrementally decode a top-level JSON array from an iterable of byte
+        chunks, yielding its items one at a time without decoding (or
+        keeping) the whole document.
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder(encoding)()
+        buffer = ''
+        # expecting: '[' -> first item or ']' -> ',' or ']' -> item ...
+        state = 'start'
+        for chunk in chunks:
+            buffer += text_decoder.decode(chunk)
+            pos = 0
+            while True:
+                pos = cls.whitespace.match(buffer, pos).end()
+                if pos == len(buffer):
+                    break
+                char = buffer[pos]
+                if state == 'start':
+                    if char != '[':
+                        raise ValueError("expected a JSON array")
+                    pos += 1
+                    state = 'first'
+                elif state == 'end':
+                    raise ValueError("extra data after the JSON array")
+                elif state == 'separator' or (state == 'first' and char == ']'):
+                    if char == ']':
+                        state = 'end'
+                    elif char != ',':
+                        raise ValueError(
+                            "expected ',' or ']' at %r" % buffer[pos:pos + 20])
+                    else:
+                        state = 'item'
+                    pos += 1
+                else:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                    except ValueError:
+                        # the item is continued in the next chunk
+                        break
+                    if end == len(buffer):
+                        # a number could be continued in the next chunk
+                        break
+                    yield item
+                    pos = end
+                    state = 'separator'
+            buffer = buffer[pos:]
+        if state != 'end':
+            if buffer.strip() and state in ['first', 'item']:
+                # raise the decoding error of the truncated item
+                decoder.raw_decode(buffer, cls.whitespace.match(buffer).end())
+            raise ValueError("incomplete JSON array")
+
+
+class ResponseUtils(object):
+    @classmethod
+    def get_json(cls, response, decode=None):
+        """
+        Decode the JSON body of a response at most once, caching the result
+        (or the ValueError raised when the body is not JSON) on the response.
+        """
+        cached = response.__dict__.get('_decoded_json', None)
+        if cached is None:
+            try:
+                cached = ((decode or response.json)(), None)
+            except ValueError as exc:
+                cached = (None, exc)
+            # decode may have cached the whole body already (APIResponse.json)
+            cached = response.__dict__.setdefault('_decoded_json', cached)
+        decoded, exc = cached
+        if exc is not None:
+            raise exc
+        return decoded
+
+    @classmethod
+    def project_fields(cls, data, fields):
+        """
+        Keep only the given fields (which can be nested like meta.color) of
+        an object or of each object of a list, like the _fields param of
+        the WP API.
+        """
+        if isinstance(data, list):
+            return [cls.project_fields(item, fields) for item in data]
+        if not isinstance(data, dict):
+            return data
+        nested = OrderedDict()
+        for field in fields:
+            key, _, rest = field.partition('.')
+            nested.setdefault(key, []).append(rest)
+        projected = OrderedDict()
+        for key, rests in nested.items():
+            if key not in data:
+                continue
+            if all(rests):
+                projected[key] = cls.project_fields(data[key], rests)
+            else:
+                projected[key] = data[key]
+        return projected
+
+
 class SeqUtils(object):
     @classmethod
     def filter_true(cls, seq):
@@ -107,6 +270,18 @@ class SeqUtils(object):
                 response.append(i)
         return response
 
+    @classmethod
+    def chunks(cls, seq, size):
+        """ Split a sequence into lists of at most size items """
+        chunk = []
+        for item in seq:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     @classmethod
     def combine_two_ordered_dicts(cls, dict_a, dict_b):
         """
@@ -137,6 +312,7 @@ class SeqUtils(object):
 class UrlUtils(object):
 
     reg_netloc = r'(?P<hostname>[^:]+)(:(?P<port>\d+))?'
+    auth_param_keys = ['consumer_key', 'consumer_secret']
 
     @classmethod
     def get_query_list(cls, url):
@@ -211,6 +387,38 @@ class UrlUtils(object):
             fragment=urlparse_result.fragment
         ))
 
+    @classmethod
+    def is_auth_param(cls, key):
+        """ Determines if a query key was added by one of the Auth classes """
+        return key.startswith('oauth_') or key in cls.auth_param_keys
+
+    @classmethod
+    def remove_auth_params(cls, url):
+        """
+        Removes any authentication params (oauth_*, consumer_key,
+        consumer_secret) from the query string of a url.
+        """
+        query_list = parse_qsl(urlparse(url).query, keep_blank_values=True)
+        query_list = [
+            (key, value) for key, value in query_list
+            if not cls.is_auth_param(key)
+        ]
+        return cls.substitute_query(url, urlencode(query_list))
+
+    @classmethod
+    def canonical_url(cls, url, ignore_keys=None):
+        """
+        Returns the url with the query params sorted and the params in
+        ignore_keys removed, so that equivalent urls compare equal.
+        """
+        ignore_keys = ignore_keys or []
+        query_list = parse_qsl(urlparse(url).query, keep_blank_values=True)
+        query_list = sorted([
+            (key, value) for key, value in query_list
+            if key not in ignore_keys
+        ])
+        return cls.substitute_query(url, urlencode(query_list))
+
     @classmethod
     def add_query(cls, url, new_key, new_value):
         """ adds a query parameter to the given url """
@@ -249,20 +457,38 @@ class UrlUtils(object):
         else:
             return ""
 
-    @staticmethod
-    def beautify_response(response):
-        """ Returns a beautified response in the default locale """
+    # bytes of a response body beautified, the rest is left out
+    beautify_limit = 16 * 1024
+
+    @classmethod
+    def beautify_response(cls, response, limit=None):
+        """
+        Returns a beautified response in the default locale, with at most
+        `limit` bytes of its body (beautify_limit by default)
+        """
+        if limit is None:
+            limit = cls.beautify_limit
         content_type = 'html'
         try:
             content_type = getattr(response, 'headers', {}).get(
                 'Content-Type', content_type)
         except:
             pass
+        content = response.content or b''
+        # decoding a slice avoids detecting the encoding of the whole body
+        try:
+            text = StrUtils.to_text(
+                content[:limit], encoding=response.encoding or 'utf-8')
+        except LookupError:
+            text = StrUtils.to_text(content[:limit])
+        if len(content) > limit:
+            text += '\n... (%d more bytes)' % (len(content) - limit)
         if 'html' in content_type.lower():
-            return BeautifulSoup(response.text, 'lxml').prettify().encode(
+            from bs4 import BeautifulSoup
+            return BeautifulSoup(text, 'lxml').prettify().encode(
                 errors='backslashreplace')
         else:
-            return response.text
+            return text
 
     @classmethod
     def remove_port(cls, url):
@@ -330,10 +556,21 @@ class UrlUtils(object):
             fragment=urlparse_result.fragment
         ))
 
+    # normalized strings, mostly the keys and auth values that recur in
+    # every signed request
+    normalized_strs = {}
+    normalized_strs_max = 4096
+
     @classmethod
     def normalize_str(cls, string):
         """ Normalize string for the purposes of url query parameters. """
-        return quote(string, '~')
+        normalized = cls.normalized_strs.get(string)
+        if normalized is None:
+            normalized = quote(string, '~')
+            if len(cls.normalized_strs) >= cls.normalized_strs_max:
+                cls.normalized_strs.clear()
+            cls.normalized_strs[string] = normalized
+        return normalized
 
     @classmethod
     def normalize_params(cls, params):
@@ -388,11 +625,11 @@ class UrlUtils(object):
             return params
 
         unique_params = []
-        seen_keys = []
+        seen_keys = set()
         for key, value in params:
             if key not in seen_keys:
                 unique_params.append((key, value))
-                seen_keys.append(key)
+                seen_keys.add(key)
         return unique_params
 
     @classmethod
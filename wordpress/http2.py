@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress HTTP/2 Transport Class
+"""
+
+__title__ = "wordpress-http2"
+
+import threading
+
+from wordpress.aio import API_AsyncRequests_Wrapper, httpx
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+
+class HTTP2Transport(API_AsyncRequests_Wrapper):
+    """
+    Transport speaking HTTP/2 with httpx, so that concurrent requests to a
+    host are multiplexed over a single connection instead of opening a
+    connection (and TLS handshake) per request. Works with API, where the
+    requests of all threads share the connection, and with AsyncAPI.
+
+    HTTP/2 is negotiated during the TLS handshake, so http:// urls use
+    HTTP/1.1 unless the `http1` option is False, which requires HTTP/2
+    without negotiation (h2c, for local servers).
+    """
+
+    def __init__(self, url, **kwargs):
+        super(HTTP2Transport, self).__init__(url, **kwargs)
+        if h2 is None:
+            raise UserWarning(
+                "HTTP2Transport requires h2, try `pip install httpx[http2]`")
+        self.http1 = kwargs.get('http1', True)
+        self.sync_session = None
+        self.lock = threading.Lock()
+
+    def get_client_kwargs(self):
+        client_kwargs = super(HTTP2Transport, self).get_client_kwargs()
+        client_kwargs.update(http1=self.http1, http2=True)
+        return client_kwargs
+
+    def get_sync_session(self):
+        with self.lock:
+            if self.sync_session is None:
+                self.sync_session = httpx.Client(**self.get_client_kwargs())
+        return self.sync_session
+
+    def send(self, request_kwargs):
+        httpx_kwargs = self.build_httpx_kwargs(
+            request_kwargs, asynchronous=False)
+        try:
+            response = self.get_sync_session().request(**httpx_kwargs)
+        except httpx.TransportError as exc:
+            raise self.adapt_exception(exc)
+        return self.adapt_response(response)
+
+    def close(self):
+        """ Close the connections of the synchronous client """
+        with self.lock:
+            if self.sync_session is not None:
+                self.sync_session.close()
+                self.sync_session = None
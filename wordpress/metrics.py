@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Metrics Classes
+"""
+
+__title__ = "wordpress-metrics"
+
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from six.moves.urllib.parse import urlparse
+
+# monotonic high resolution clock where available
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class RequestEvent(object):
+    """
+    Describes a request attempt for the hooks of API_Requests_Wrapper.
+
+    `timings` maps the phases of the request to their duration in seconds:
+    url_build, sign and encode (measured by API), ttfb (until the response
+    headers were parsed, including connecting), download and json_decode.
+    `duration` is the time from the start of the attempt to the response.
+    """
+
+    def __init__(self, method, endpoint, attempt=0, dispatch=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.template = self.get_template(endpoint)
+        self.attempt = attempt
+        self.dispatch = dispatch
+        self.started = clock()
+        self.timings = OrderedDict()
+        self.url = None
+        self.status_code = None
+        self.bytes_out = 0
+        self.bytes_in = None
+        self.duration = None
+        self.retry_delay = None
+        self.exception = None
+
+    # path segments identifying an object
+    id_segment = re.compile(r'^\d+$')
+
+    @classmethod
+    def get_template(cls, endpoint):
+        """
+        Endpoint with the query removed and the ids replaced by {id}, like
+        products/{id}/variations, to group the requests of an endpoint.
+        """
+        path = urlparse(endpoint).path.strip('/')
+        return '/'.join([
+            '{id}' if cls.id_segment.match(segment) else segment
+            for segment in path.split('/')
+        ])
+
+    def time(self, phase, started):
+        """ Record the duration of a phase started at `started` """
+        now = clock()
+        self.timings[phase] = self.timings.get(phase, 0) + now - started
+        return now
+
+    def emit(self, name):
+        if self.dispatch is not None:
+            self.dispatch(name, self)
+
+    def __repr__(self):
+        return "<RequestEvent %s %s attempt=%d status=%s>" % (
+            self.method, self.template, self.attempt, self.status_code)
+
+
+class MetricsAggregator(object):
+    """
+    In-memory aggregate of the requests made through one or more API
+    instances: counts, errors, bytes and p50 / p95 / p99 durations per
+    method and endpoint template.
+
+    Percentiles are computed over the last `window` requests of each
+    endpoint.
+    """
+
+    percentiles = [50, 95, 99]
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.lock = threading.Lock()
+        self.endpoints = OrderedDict()
+
+    def attach(self, api):
+        """ Record the requests made through api """
+        api.requester.add_hook('on_response', self.record)
+        api.requester.add_hook('on_error', self.record)
+        return self
+
+    def get_stats(self, key):
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = dict(
+                count=0, errors=0, bytes_in=0, bytes_out=0,
+                statuses=OrderedDict(), durations=deque(maxlen=self.window),
+            )
+        return stats
+
+    def record(self, event):
+        with self.lock:
+            stats = self.get_stats((event.method, event.template))
+            stats['count'] += 1
+            stats['bytes_out'] += event.bytes_out or 0
+            stats['bytes_in'] += event.bytes_in or 0
+            if event.exception is not None or (event.status_code or 0) >= 400:
+                stats['errors'] += 1
+            if event.status_code is not None:
+                stats['statuses'][event.status_code] = \
+                    stats['statuses'].get(event.status_code, 0) + 1
+            if event.duration is not None:
+                stats['durations'].append(event.duration)
+
+    @classmethod
+    def get_percentile(cls, ordered, percentile):
+        """ Nearest-rank percentile of an ordered list """
+        if not ordered:
+            return None
+        rank = int(math.ceil(percentile / 100.0 * len(ordered)))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+    def summary(self):
+        """
+        Dict of the stats of each "METHOD template", with the p50, p95 and
+        p99 durations in seconds.
+        """
+        summary = OrderedDict()
+        with self.lock:
+            for (method, template), stats in self.endpoints.items():
+                ordered = sorted(stats['durations'])
+                endpoint_summary = OrderedDict([
+                    ('count', stats['count']),
+                    ('errors', stats['errors']),
+                    ('bytes_in', stats['bytes_in']),
+                    ('bytes_out', stats['bytes_out']),
+                    ('statuses', OrderedDict(stats['statuses'])),
+                ])
+                for percentile in self.percentiles:
+                    endpoint_summary['p%d' % percentile] = \
+                        self.get_percentile(ordered, percentile)
+                summary['%s %s' % (method, template)] = endpoint_summary
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
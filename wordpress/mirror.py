@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Mirror Class
+"""
+
+__title__ = "wordpress-mirror"
+
+import json
+import os
+import sqlite3
+import threading
+
+from wordpress.helpers import JsonUtils, SeqUtils
+from wordpress.sync import SQLiteSyncState, Sync
+
+
+class Mirror(object):
+    """
+    Local copy of collections (posts, products, orders, customers...) in a
+    sqlite database, for fast lookups by id, slug, sku or modification date
+    without requests to the site.
+
+    Collections are kept fresh with refresh(), which only fetches the items
+    that changed since the previous refresh (see wordpress.sync.Sync). Items
+    deleted on the site are only removed by rebuild().
+    """
+
+    # columns indexed for lookups, in addition to the id
+    indexed_fields = ['slug', 'sku', 'modified']
+
+    def __init__(self, api, path=':memory:', per_page=100, batch_size=500):
+        self.api = api
+        self.path = os.path.expanduser(path)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " collection TEXT,"
+                " id INTEGER,"
+                " slug TEXT,"
+                " sku TEXT,"
+                " modified TEXT,"
+                " data TEXT,"
+                " PRIMARY KEY (collection, id)"
+                ")"
+            )
+            for field in self.indexed_fields:
+                self.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS items_%s "
+                    "ON items (collection, %s)" % (field, field)
+                )
+        if path == ':memory:':
+            state = None
+        else:
+            state = SQLiteSyncState(self.path)
+        self.sync = Sync(api, state=state, per_page=per_page)
+
+    def get_row(self, collection, item):
+        # GMT dates, whichever dates the sync compares
+        modified = self.sync.get_item_date(item, Sync.gmt_date_fields)
+        if modified is not None:
+            modified = modified.strftime(Sync.date_format)
+        return (
+            collection, item['id'], item.get('slug') or None,
+            item.get('sku') or None, modified, json.dumps(item)
+        )
+
+    def store(self, collection, items):
+        """ Insert or replace items of collection """
+        rows = [self.get_row(collection, item) for item in items]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def refresh(self, collection, endpoint=None, **kwargs):
+        """
+        Fetch the items of collection that changed since the last refresh
+        from endpoint (the collection name by default), returning the number
+        of items stored.
+        """
+        changes = self.sync.iter_changes(endpoint or collection, **kwargs)
+        count = 0
+        for items in SeqUtils.chunks(changes, self.batch_size):
+            self.store(collection, items)
+            count += len(items)
+        return count
+
+    def rebuild(self, collection, endpoint=None, **kwargs):
+        """ Fetch the whole collection again, dropping deleted items """
+        self.sync.reset(endpoint or collection)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM items WHERE collection = ?", (collection,))
+        return self.refresh(collection, endpoint, **kwargs)
+
+    def query(self, collection, where='', params=()):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT data FROM items WHERE collection = ?%s "
+                "ORDER BY id" % where,
+                (collection,) + tuple(params)
+            ).fetchall()
+        return [JsonUtils.loads(data) for data, in rows]
+
+    def get(self, collection, item_id):
+        """ The item of collection with the given id, or None """
+        items = self.query(collection, " AND id = ?", [item_id])
+        return items[0] if items else None
+
+    def find(self, collection, **criteria):
+        """
+        Items of collection matching all the criteria, which are indexed
+        fields (id, slug, sku, modified) and modified_after / modified_before
+        (exclusive, as %Y-%m-%dT%H:%M:%S GMT dates).
+        """
+        where, params = '', []
+        operators = {'modified_after': ('modified', '>'),
+                     'modified_before': ('modified', '<')}
+        for key, value in sorted(criteria.items()):
+            if key in operators:
+                column, operator = operators[key]
+            elif key == 'id' or key in self.indexed_fields:
+                column, operator = key, '='
+            else:
+                raise UserWarning("can't find items by %s" % key)
+            where += " AND %s %s ?" % (column, operator)
+            params.append(value)
+        return self.query(collection, where, params)
+
+    def find_one(self, collection, **criteria):
+        """ The first item of collection matching criteria, or None """
+        items = self.find(collection, **criteria)
+        return items[0] if items else None
+
+    def get_by_slug(self, collection, slug):
+        return self.find_one(collection, slug=slug)
+
+    def get_by_sku(self, collection, sku):
+        return self.find_one(collection, sku=sku)
+
+    def all(self, collection):
+        """ Every item of collection """
+        return self.query(collection)
+
+    def count(self, collection):
+        with self.lock:
+            count, = self.connection.execute(
+                "SELECT COUNT(*) FROM items WHERE collection = ?",
+                (collection,)
+            ).fetchone()
+        return count
+
+    def close(self):
+        self.connection.close()
+        if isinstance(self.sync.state, SQLiteSyncState):
+            self.sync.state.close()
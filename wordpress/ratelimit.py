@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Rate Limiting Class
+"""
+
+__title__ = "wordpress-ratelimit"
+
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket allowing `rate` requests per second on average
+    with bursts of up to `burst` requests.
+
+    Callers reserve a token and are told how long to wait for it, so that
+    threads sharing a bucket are paced in the order they arrived instead of
+    all waking up at once.
+    """
+
+    def __init__(self, rate, burst=None, clock=None):
+        if rate <= 0:
+            raise UserWarning("rate limit must be positive, not %s" % rate)
+        self.rate = float(rate)
+        if burst is None:
+            burst = max(1, self.rate)
+        self.burst = float(burst)
+        self.clock = clock or time.time
+        self.tokens = self.burst
+        self.updated = self.clock()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_value(cls, value, burst=None):
+        """
+        Create a bucket from the `rate_limit` option of API, which can be a
+        TokenBucket, a number of requests per second or None for no limit.
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(value, burst)
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket, returning the number of seconds to wait
+        before they are available.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """ Block until tokens are available. """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Response Class
+"""
+
+__title__ = "wordpress-response"
+
+from requests import Response
+
+from wordpress.helpers import JsonUtils, ResponseUtils
+from wordpress.metrics import clock
+
+
+class APIResponse(Response):
+    """
+    requests.Response whose JSON body is decoded at most once, with the
+    fastest installed JSON backend (see JsonUtils).
+    """
+
+    utf8_encodings = [None, 'utf-8', 'utf8']
+    # fields requested with _fields, to project the body with if the server
+    # ignores them.
+    projection = None
+
+    @classmethod
+    def from_response(cls, response):
+        """ Wrap a requests.Response, sharing its state """
+        if isinstance(response, cls):
+            return response
+        wrapped = cls.__new__(cls)
+        wrapped.__dict__.update(response.__dict__)
+        return wrapped
+
+    def copy(self):
+        """
+        Copy of the response sharing its (immutable) body but not its
+        decoded JSON, so that changes to one's decoded body don't leak.
+        """
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied.__dict__.pop('_decoded_json', None)
+        copied.__dict__.pop('_projected_json', None)
+        copied.headers = self.headers.copy()
+        return copied
+
+    def decode_json(self):
+        """
+        Decode the body with JsonUtils, falling back to requests for bodies
+        that are not UTF-8 so that encoding detection behaves the same.
+        """
+        encoding = self.encoding.lower() if self.encoding else None
+        if encoding in self.utf8_encodings:
+            try:
+                return JsonUtils.loads(self.content)
+            except ValueError:
+                pass
+        return super(APIResponse, self).json()
+
+    def decode_timed_json(self):
+        started = clock()
+        decoded = self.decode_json()
+        event = self.__dict__.get('event')
+        if event is not None:
+            # see API_Requests_Wrapper.hooks
+            event.time('json_decode', started)
+            event.emit('on_decode')
+        return decoded
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super(APIResponse, self).json(**kwargs)
+        # the cache holds the whole body, which may have been decoded (e.g.
+        # to be logged) before the projection was set
+        decoded = ResponseUtils.get_json(self, self.decode_timed_json)
+        if not self.projection:
+            return decoded
+        projection = tuple(self.projection)
+        cached = self.__dict__.get('_projected_json', None)
+        if cached is None or cached[0] != projection:
+            cached = (projection, ResponseUtils.project_fields(
+                decoded, self.projection))
+            self._projected_json = cached
+        return cached[1]
+
+    def iter_json(self, chunk_size=64 * 1024):
+        """
+        Yield the items of a JSON array body one at a time. On a response
+        requested with stream=True the body is decoded as it is downloaded
+        instead of being held in memory.
+        """
+        try:
+            for item in JsonUtils.iter_array(
+                self.iter_content(chunk_size), self.encoding or 'utf-8'
+            ):
+                if self.projection:
+                    item = ResponseUtils.project_fields(item, self.projection)
+                yield item
+        finally:
+            self.close()
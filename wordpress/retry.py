@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Retry Class
+"""
+
+__title__ = "wordpress-retry"
+
+import random
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+from requests.exceptions import ConnectionError, Timeout
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed request should be retried and how long to wait
+    beforehand.
+
+    Responses with a status in `status_forcelist` and connection errors /
+    timeouts are retried up to `total` times for the idempotent `methods`.
+    429 (Too Many Requests) responses were not processed by the server so
+    they are retried for any method. The wait grows exponentially from
+    `backoff_factor` up to `backoff_max` seconds with full jitter, unless
+    the server asks for a specific wait (of at most `retry_after_max`
+    seconds) with a Retry-After header.
+    """
+
+    default_methods = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+    default_status_forcelist = [429, 502, 503, 504]
+
+    def __init__(
+        self, total=3, backoff_factor=0.5, backoff_max=30, jitter=True,
+        status_forcelist=None, methods=None, respect_retry_after=True,
+        retry_after_max=300
+    ):
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        if status_forcelist is None:
+            status_forcelist = self.default_status_forcelist
+        self.status_forcelist = status_forcelist
+        if methods is None:
+            methods = self.default_methods
+        self.methods = [method.upper() for method in methods]
+        self.respect_retry_after = respect_retry_after
+        self.retry_after_max = retry_after_max
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create a policy from the `retries` option of API, which can be a
+        RetryPolicy, the number of retries or None for no retries.
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(total=value)
+
+    def get_backoff(self, attempt):
+        """ Seconds to wait after the given (zero based) failed attempt """
+        backoff = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        return backoff
+
+    @classmethod
+    def parse_retry_after(cls, response):
+        """
+        Seconds requested by the Retry-After header of the response, which
+        is either a number of seconds or a HTTP date. None if absent.
+        """
+        value = getattr(response, 'headers', {}).get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+        parsed = parsedate_tz(value)
+        if parsed is None:
+            return None
+        return max(0, mktime_tz(parsed) - time.time())
+
+    def is_retryable(self, method, response=None, exception=None):
+        if exception is not None:
+            return (
+                isinstance(exception, (ConnectionError, Timeout))
+                and method.upper() in self.methods
+            )
+        if response.status_code == 429:
+            return 429 in self.status_forcelist
+        return (
+            response.status_code in self.status_forcelist
+            and method.upper() in self.methods
+        )
+
+    def get_retry_delay(self, method, attempt, response=None, exception=None):
+        """
+        Return the seconds to wait before retrying the request after the
+        given (zero based) attempt, or None if it should not be retried.
+        """
+        if attempt >= self.total:
+            return None
+        if not self.is_retryable(method, response, exception):
+            return None
+        if response is not None and self.respect_retry_after:
+            retry_after = self.parse_retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.retry_after_max)
+        return self.get_backoff(attempt)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Incremental Sync Classes
+"""
+
+__title__ = "wordpress-sync"
+
+import io
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from wordpress.helpers import UrlUtils
+
+
+class SyncState(object):
+    """
+    Boilerplate for storing the high-water mark of each synced endpoint.
+
+    States are dicts with the latest modification date seen (`modified`) and
+    the ids of the items modified at that date (`ids`). Subclasses provide
+    the storage.
+    """
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create a state store from the `state` argument of Sync, which can be
+        a SyncState, the path of a sqlite database (.db, .sqlite, .sqlite3),
+        the path of a JSON file or None to keep the state in memory.
+        """
+        if isinstance(value, cls):
+            return value
+        if value is None:
+            return MemorySyncState()
+        if os.path.splitext(value)[1].lower() in ['.db', '.sqlite', '.sqlite3']:
+            return SQLiteSyncState(value)
+        return JSONSyncState(value)
+
+    def get(self, key):
+        """ Return the state stored at key or None """
+        raise NotImplementedError()
+
+    def set(self, key, state):
+        """ Store a state at key """
+        raise NotImplementedError()
+
+    def delete(self, key):
+        """ Remove the state stored at key if any """
+        raise NotImplementedError()
+
+
+class MemorySyncState(SyncState):
+    def __init__(self):
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.states.get(key)
+
+    def set(self, key, state):
+        with self.lock:
+            self.states[key] = state
+
+    def delete(self, key):
+        with self.lock:
+            self.states.pop(key, None)
+
+
+class JSONSyncState(SyncState):
+    """ State of all endpoints in a JSON file, rewritten on every change """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        with io.open(self.path, encoding='utf-8') as state_file:
+            try:
+                return json.load(state_file)
+            except ValueError:
+                return {}
+
+    def dump(self, states):
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+        # write a temporary file first so that a crash can't truncate it
+        tmp_path = '%s.tmp' % self.path
+        with io.open(tmp_path, 'w', encoding='utf-8') as state_file:
+            state_file.write(json.dumps(states, ensure_ascii=False))
+        if os.path.exists(self.path) and not hasattr(os, 'replace'):
+            os.remove(self.path)
+        getattr(os, 'replace', os.rename)(tmp_path, self.path)
+
+    def get(self, key):
+        with self.lock:
+            return self.load().get(key)
+
+    def set(self, key, state):
+        with self.lock:
+            states = self.load()
+            states[key] = state
+            self.dump(states)
+
+    def delete(self, key):
+        with self.lock:
+            states = self.load()
+            if states.pop(key, None) is not None:
+                self.dump(states)
+
+
+class SQLiteSyncState(SyncState):
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                " key TEXT PRIMARY KEY,"
+                " state TEXT"
+                ")"
+            )
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT state FROM sync_state WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, state):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                (key, json.dumps(state))
+            )
+
+    def delete(self, key):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM sync_state WHERE key = ?", (key,))
+
+    def close(self):
+        self.connection.close()
+
+
+class Sync(object):
+    """
+    Fetches only the items of collection endpoints that changed since the
+    last sync, using a high-water mark stored per endpoint in `state`.
+
+    Items are requested with `date_param` (e.g. modified_after) set to the
+    latest modification date seen (the first of `date_fields` found in the
+    items), minus `overlap` seconds to allow for items saved in the same
+    second. Items that were already seen in the overlap are skipped.
+
+    The server must compare `date_param` with the same dates as the mark.
+    WooCommerce compares GMT dates with dates_are_gmt, so its mark is
+    date_modified_gmt. WordPress compares local dates and has no
+    dates_are_gmt, so its mark is the local `modified` date.
+
+    The first sync of an endpoint fetches every item.
+    """
+
+    date_format = '%Y-%m-%dT%H:%M:%S'
+    gmt_date_fields = ['modified_gmt', 'date_modified_gmt']
+    local_date_fields = ['modified', 'date_modified']
+
+    def __init__(
+        self, api, state=None, date_fields=None, date_param='modified_after',
+        overlap=1, per_page=100
+    ):
+        self.api = api
+        self.state = SyncState.from_value(state)
+        if date_fields is None:
+            date_fields = self.get_default_date_fields()
+        self.date_fields = date_fields
+        self.date_param = date_param
+        self.overlap = overlap
+        self.per_page = per_page
+
+    @property
+    def dates_are_gmt(self):
+        """ Whether the mark is a GMT date, which needs dates_are_gmt """
+        return all(field.endswith('_gmt') for field in self.date_fields)
+
+    def get_default_date_fields(self):
+        # only WooCommerce supports dates_are_gmt
+        if self.api.requester.api_version.startswith('wc'):
+            return self.gmt_date_fields
+        return self.local_date_fields
+
+    def get_state(self, key):
+        """
+        State of key, ignoring marks in the other timezone (states without
+        `local` have GMT marks)
+        """
+        state = self.state.get(key)
+        local = not self.dates_are_gmt
+        if state is not None and state.get('local', False) != local:
+            return None
+        return state
+
+    def get_key(self, endpoint):
+        return UrlUtils.canonical_url(
+            self.api.requester.endpoint_url(endpoint))
+
+    def get_item_date(self, item, date_fields=None):
+        for field in date_fields or self.date_fields:
+            if item.get(field):
+                return self.parse_date(item[field])
+        return None
+
+    @classmethod
+    def parse_date(cls, value):
+        # drop fractions of seconds and timezones, dates are compared in the
+        # timezone of the date fields (GMT with dates_are_gmt, else local)
+        return datetime.strptime(value[:19], cls.date_format)
+
+    def get_changes_endpoint(self, endpoint, state):
+        if state is None:
+            return endpoint
+        since = self.parse_date(state['modified']) - timedelta(
+            seconds=self.overlap)
+        endpoint = UrlUtils.set_query_singular(
+            endpoint, self.date_param, since.strftime(self.date_format))
+        if self.dates_are_gmt:
+            # WooCommerce compares dates in the site timezone otherwise
+            endpoint = UrlUtils.set_query_singular(
+                endpoint, 'dates_are_gmt', 'true')
+        return endpoint
+
+    def iter_changes(self, endpoint, **kwargs):
+        """
+        Lazily GET the items of endpoint that changed since the last sync.
+
+        The high-water mark is only saved once every item has been yielded,
+        so an interrupted sync is resumed from the previous mark.
+        """
+        key = self.get_key(endpoint)
+        state = self.get_state(key)
+        mark, seen_ids = None, set()
+        if state is not None:
+            mark = self.parse_date(state['modified'])
+            seen_ids = set(state['ids'])
+
+        new_mark, new_ids = mark, set(seen_ids)
+        for item in self.api.iter_items(
+            self.get_changes_endpoint(endpoint, state), self.per_page,
+            **kwargs
+        ):
+            modified = self.get_item_date(item)
+            if modified is None:
+                yield item
+                continue
+            if mark is not None and (
+                modified < mark or (modified == mark and item['id'] in seen_ids)
+            ):
+                continue
+            if new_mark is None or modified > new_mark:
+                new_mark, new_ids = modified, set()
+            if modified == new_mark:
+                new_ids.add(item['id'])
+            yield item
+
+        if new_mark is not None and (new_mark, new_ids) != (mark, seen_ids):
+            state = {
+                'modified': new_mark.strftime(self.date_format),
+                'ids': sorted(new_ids),
+            }
+            if not self.dates_are_gmt:
+                state['local'] = True
+            self.state.set(key, state)
+
+    def get_changes(self, endpoint, **kwargs):
+        """ List of the items of endpoint that changed since the last sync """
+        return list(self.iter_changes(endpoint, **kwargs))
+
+    def reset(self, endpoint):
+        """ Forget the high-water mark so that the next sync fetches all """
+        self.state.delete(self.get_key(endpoint))
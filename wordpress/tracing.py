@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Tracing Classes
+"""
+
+__title__ = "wordpress-tracing"
+
+from six.moves.urllib.parse import urlparse, urlunparse
+
+from wordpress import __version__
+from wordpress.helpers import UrlUtils
+from wordpress.metrics import RequestEvent
+
+try:
+    from opentelemetry import propagate as otel_propagate
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_propagate = None
+    otel_trace = None
+
+
+class NoopSpan(object):
+    """ Span used when tracing is disabled, ignores everything """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def is_recording(self):
+        return False
+
+
+class Tracer(object):
+    """
+    Creates spans with an OpenTelemetry tracer, or no-op spans when there is
+    no tracer (opentelemetry-api isn't installed or tracing is disabled).
+
+    Spans are started as the current span, so the spans of a request are
+    nested and the traceparent header sent to the site continues the trace
+    of the caller (e.g. a queue worker).
+    """
+
+    noop_span = NoopSpan()
+
+    def __init__(self, tracer=None, propagator=None):
+        self.tracer = tracer
+        if propagator is None:
+            propagator = otel_propagate
+        self.propagator = propagator
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create a tracer from the `tracer` argument of API, which can be a
+        Tracer, an OpenTelemetry tracer, False to disable tracing or None to
+        use the global tracer provider when opentelemetry-api is installed.
+        """
+        if isinstance(value, cls):
+            return value
+        if value is False or (value is None and otel_trace is None):
+            return cls()
+        if value is None or value is True:
+            value = otel_trace.get_tracer("wordpress-api", __version__)
+        return cls(value)
+
+    @property
+    def enabled(self):
+        return self.tracer is not None
+
+    def span(self, name, attributes=None, client=False):
+        """
+        Context manager of a span named name, yielding the span. Attributes
+        which are None are left out.
+        """
+        if self.tracer is None:
+            return self.noop_span
+        kwargs = {}
+        if attributes:
+            kwargs['attributes'] = dict(
+                (key, value) for key, value in attributes.items()
+                if value is not None
+            )
+        if client and otel_trace is not None:
+            kwargs['kind'] = otel_trace.SpanKind.CLIENT
+        return self.tracer.start_as_current_span(name, **kwargs)
+
+    def current_span(self):
+        if self.tracer is None or otel_trace is None:
+            return self.noop_span
+        return otel_trace.get_current_span()
+
+    def inject(self, headers):
+        """ Add the traceparent header of the current span to headers """
+        if self.tracer is not None and self.propagator is not None:
+            self.propagator.inject(headers)
+        return headers
+
+    @classmethod
+    def set_attributes(cls, span, attributes):
+        for key, value in attributes.items():
+            if value is not None:
+                span.set_attribute(key, value)
+
+    @classmethod
+    def get_request_attributes(cls, method, endpoint):
+        """ Attributes of the span of an API request """
+        page = UrlUtils.get_query_dict_singular(endpoint).get('page', '')
+        return {
+            'http.method': method.upper(),
+            'wordpress.endpoint': RequestEvent.get_template(endpoint),
+            'wordpress.page': int(page) if page.isdigit() else None,
+        }
+
+    @classmethod
+    def get_url_attribute(cls, url):
+        """ url without its query, which may contain credentials """
+        return urlunparse(urlparse(url)._replace(query='', fragment=''))
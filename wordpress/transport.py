@@ -10,13 +10,28 @@ import logging
 from pprint import pformat
 
 from requests import Session
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from wordpress import __default_api__, __default_api_version__, __version__
-from wordpress.helpers import SeqUtils, StrUtils, UrlUtils
+from wordpress.cache import ResponseCache
+from wordpress.helpers import ResponseUtils, SeqUtils, StrUtils, UrlUtils
+from wordpress.metrics import RequestEvent, clock
+from wordpress.response import APIResponse
+from wordpress.tracing import Tracer
 
 
 class API_Requests_Wrapper(object):
-    """ provides a wrapper for making requests that handles session info """
+    """
+    provides a wrapper for making requests that handles session info
+
+    This is the transport interface used by API and the Auth classes: the
+    url, api, api_version, timeout and verify_ssl attributes, the api_url
+    and api_ver_url properties, endpoint_url and request (and its get, post,
+    put and delete shortcuts), along with the hooks and tracer. Alternative
+    transports subclass it and override send, which takes the arguments of
+    requests.Session.request and returns a requests.Response, and are
+    passed to API as `transport`.
+    """
 
     def __init__(self, url, **kwargs):
         self.logger = logging.getLogger(__name__)
@@ -27,6 +42,100 @@ class API_Requests_Wrapper(object):
         self.verify_ssl = kwargs.get("verify_ssl", True)
         self.session = Session()
         self.headers = kwargs.get("headers", {})
+        self.cache = ResponseCache.from_value(kwargs.get("cache"))
+        self.adapter_kwargs = self.get_adapter_kwargs(**kwargs)
+        self.mount_adapters(kwargs.get("adapters", {}))
+        self.tracer = Tracer.from_value(kwargs.get("tracer"))
+        self.hooks = dict((event, []) for event in self.hook_events)
+        for event, callbacks in kwargs.get("hooks", {}).items():
+            for callback in (
+                callbacks if isinstance(callbacks, list) else [callbacks]
+            ):
+                self.add_hook(event, callback)
+
+    hook_events = [
+        'on_request_start', 'on_response', 'on_retry', 'on_error',
+        'on_decode'
+    ]
+
+    def add_hook(self, event, callback):
+        """
+        Call callback with a wordpress.metrics.RequestEvent on event, one of
+        hook_events.
+        """
+        if event not in self.hooks:
+            raise UserWarning("unknown hook %s, not in %s" % (
+                event, self.hook_events))
+        self.hooks[event].append(callback)
+
+    def remove_hook(self, event, callback):
+        self.hooks[event].remove(callback)
+
+    @property
+    def has_hooks(self):
+        return any(self.hooks.values())
+
+    def dispatch(self, event, request_event):
+        for callback in self.hooks[event]:
+            callback(request_event)
+
+    def start_event(self, method, endpoint, attempt=0):
+        """ RequestEvent for a request attempt, or None without hooks """
+        if not self.has_hooks:
+            return None
+        return RequestEvent(method, endpoint, attempt, self.dispatch)
+
+    @classmethod
+    def get_body_size(cls, data):
+        if data is None:
+            return 0
+        if hasattr(data, 'len'):
+            return data.len
+        try:
+            return len(data)
+        except TypeError:
+            return None
+
+    @classmethod
+    def get_response_size(cls, response):
+        if response._content is not False:
+            return len(response.content or b'')
+        # streamed, the body hasn't been read yet
+        return int(response.headers.get('Content-Length', 0))
+
+    adapter_options = ['pool_connections', 'pool_maxsize', 'pool_block']
+
+    def get_adapter_kwargs(self, **kwargs):
+        """
+        Connection pool settings for the session's adapters. The pool is at
+        least as large as the number of workers so that concurrent requests
+        don't discard connections.
+        """
+        adapter_kwargs = dict(
+            (key, kwargs[key]) for key in self.adapter_options if key in kwargs
+        )
+        workers = kwargs.get('workers', 1)
+        if 'pool_maxsize' not in adapter_kwargs and workers > DEFAULT_POOLSIZE:
+            adapter_kwargs['pool_maxsize'] = workers
+        return adapter_kwargs
+
+    def mount_adapters(self, adapters):
+        """
+        Mount adapters for the connection pool settings on the session.
+
+        `adapters` maps url prefixes (like "https://example.com") to either
+        a transport adapter or a dict of settings overriding the defaults for
+        that prefix.
+        """
+        if self.adapter_kwargs:
+            for prefix in ['https://', 'http://']:
+                self.session.mount(prefix, HTTPAdapter(**self.adapter_kwargs))
+        for prefix, adapter in adapters.items():
+            if isinstance(adapter, dict):
+                adapter = HTTPAdapter(**SeqUtils.combine_ordered_dicts(
+                    self.adapter_kwargs, adapter
+                ))
+            self.session.mount(prefix, adapter)
 
     @property
     def is_ssl(self):
@@ -60,10 +169,14 @@ class API_Requests_Wrapper(object):
     def api_ver_url_no_port(self):
         return UrlUtils.remove_port(self.api_ver_url)
 
-    def endpoint_url(self, endpoint):
+    def relative_endpoint(self, endpoint):
+        """ endpoint relative to the api version, even if given as a url """
         endpoint = StrUtils.decapitate(endpoint, self.api_ver_url)
         endpoint = StrUtils.decapitate(endpoint, self.api_ver_url_no_port)
-        endpoint = StrUtils.decapitate(endpoint, '/')
+        return StrUtils.decapitate(endpoint, '/')
+
+    def endpoint_url(self, endpoint):
+        endpoint = self.relative_endpoint(endpoint)
         components = [
             self.url,
             self.api
@@ -77,9 +190,13 @@ class API_Requests_Wrapper(object):
         ]
         return UrlUtils.join_components(components)
 
-    def request(
+    def build_request_kwargs(
         self, method, url, auth=None, params=None, data=None, **kwargs
     ):
+        """
+        Combine the default headers and settings of this requester with the
+        arguments of a single request.
+        """
         headers = {
             "user-agent": "Wordpress API Client-Python/%s" % __version__,
             "accept": "application/json"
@@ -109,20 +226,28 @@ class API_Requests_Wrapper(object):
             request_kwargs['params'] = params
         if data is not None:
             request_kwargs['data'] = data
+        return request_kwargs
+
+    def log_request(self, request_kwargs):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug("request_kwargs:\n%s" % pformat([
             (key, repr(value)[:1000]) for key, value in request_kwargs.items()
         ]))
-        response = self.session.request(
-            **request_kwargs
-        )
+
+    def log_response(self, response):
+        """
+        Log the response at DEBUG level. The decoded body is cached on the
+        response so that it is not decoded again by the caller.
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug("response_code:\n%s" % pformat(response.status_code))
-        try:
-            response_json = response.json()
-            self.logger.debug("response_json:\n%s" %
-                              (pformat(response_json)[:1000]))
-        except ValueError:
-            response_text = response.text
-            self.logger.debug("response_text:\n%s" % (response_text[:1000]))
+        if response._content is False:
+            # reading a streamed body here would defeat streaming
+            self.logger.debug("response_content: <streamed>")
+        else:
+            self.log_response_content(response)
         response_headers = {}
         if hasattr(response, 'headers'):
             response_headers = response.headers
@@ -132,6 +257,130 @@ class API_Requests_Wrapper(object):
             response_links = response.links
         self.logger.debug("response_links:\n%s" % pformat(response_links))
 
+    def log_response_content(self, response):
+        try:
+            response_json = ResponseUtils.get_json(response)
+            self.logger.debug("response_json:\n%s" %
+                              (pformat(response_json)[:1000]))
+        except ValueError:
+            response_text = response.text
+            self.logger.debug("response_text:\n%s" % (response_text[:1000]))
+
+    def get_cache_entry(self, request_kwargs):
+        """
+        Find the cached response for a GET request and add the headers to
+        revalidate it to request_kwargs. Returns the cache key and entry.
+        """
+        if (
+            self.cache is None
+            or request_kwargs['method'].upper() != 'GET'
+            or request_kwargs.get('stream')
+        ):
+            return None, None
+        cache_key = self.cache.get_key(request_kwargs['url'])
+        cache_entry = self.cache.get(cache_key)
+        if cache_entry is not None:
+            request_kwargs['headers'] = SeqUtils.combine_ordered_dicts(
+                request_kwargs['headers'],
+                self.cache.get_validators(cache_entry)
+            )
+        return cache_key, cache_entry
+
+    def update_cache(self, response, cache_key, cache_entry):
+        """
+        Store a cacheable response, or replace a 304 response with the
+        cached response it refers to.
+        """
+        if cache_key is None:
+            return response
+        if response.status_code == 304 and cache_entry is not None:
+            self.logger.debug("response served from cache")
+            return self.cache.response_from_entry(cache_entry, response)
+        if self.cache.is_cacheable(response):
+            self.cache.set(cache_key, self.cache.entry_from_response(response))
+        return response
+
+    def start_span(self, request_kwargs):
+        """ Client span of a request, see wordpress.tracing.Tracer """
+        if not self.tracer.enabled:
+            return Tracer.noop_span
+        return self.tracer.span(
+            'HTTP %s' % request_kwargs['method'].upper(), {
+                'http.method': request_kwargs['method'].upper(),
+                'http.url': Tracer.get_url_attribute(request_kwargs['url']),
+                'http.request_content_length': self.get_body_size(
+                    request_kwargs.get('data')),
+            }, client=True
+        )
+
+    def end_span(self, span, response):
+        Tracer.set_attributes(span, {
+            'http.status_code': response.status_code,
+            'http.response_content_length': self.get_response_size(response),
+        })
+
+    def emit_request_start(self, event, request_kwargs):
+        if event is None:
+            return
+        event.url = request_kwargs['url']
+        event.bytes_out = self.get_body_size(request_kwargs.get('data'))
+        event.emit('on_request_start')
+
+    def emit_response(self, event, response, sent):
+        """
+        Complete event with the response to the request sent at `sent`.
+        requests only reports the time until the response headers were
+        parsed (elapsed), the rest of the request is the download.
+        """
+        if event is None:
+            return
+        now = clock()
+        elapsed = getattr(response, 'elapsed', None)
+        if elapsed is not None and not getattr(response, 'from_cache', False):
+            ttfb = min(elapsed.total_seconds(), now - sent)
+            event.timings['ttfb'] = ttfb
+            event.timings['download'] = now - sent - ttfb
+        event.duration = now - event.started
+        event.status_code = response.status_code
+        event.bytes_in = self.get_response_size(response)
+        response.event = event
+        event.emit('on_response')
+
+    def emit_error(self, event, exception):
+        if event is None:
+            return
+        event.duration = clock() - event.started
+        event.exception = exception
+        event.emit('on_error')
+
+    def send(self, request_kwargs):
+        """ Send a request built by build_request_kwargs """
+        return self.session.request(**request_kwargs)
+
+    def request(
+        self, method, url, auth=None, params=None, data=None, event=None,
+        **kwargs
+    ):
+        request_kwargs = self.build_request_kwargs(
+            method, url, auth=auth, params=params, data=data, **kwargs
+        )
+        cache_key, cache_entry = self.get_cache_entry(request_kwargs)
+        self.log_request(request_kwargs)
+        with self.start_span(request_kwargs) as span:
+            self.tracer.inject(request_kwargs['headers'])
+            self.emit_request_start(event, request_kwargs)
+            sent = clock()
+            try:
+                response = self.send(request_kwargs)
+            except Exception as exc:
+                self.emit_error(event, exc)
+                raise
+            response = self.update_cache(response, cache_key, cache_entry)
+            response = APIResponse.from_response(response)
+            self.log_response(response)
+            self.emit_response(event, response, sent)
+            self.end_span(span, response)
+
         return response
 
     def get(self, *args, **kwargs):
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+Wordpress Upload Classes
+"""
+
+__title__ = "wordpress-upload"
+
+import hashlib
+import io
+import json
+import mimetypes
+import mmap
+import os
+import threading
+
+from six.moves.urllib.parse import quote
+
+
+class UploadReader(object):
+    """
+    File-like request body streaming a file in chunks, so that uploads
+    don't hold the whole file in memory.
+
+    `progress` is called with the number of bytes read so far and the total
+    size (None when the size of the file is unknown).
+
+    When the size is known, requests sends it as Content-Length, otherwise
+    the body is sent with chunked transfer encoding.
+    """
+
+    def __init__(self, fileobj, progress=None, chunk_size=64 * 1024):
+        self.fileobj = fileobj
+        self.progress = progress
+        self.chunk_size = chunk_size
+        try:
+            self.start = fileobj.tell()
+            fileobj.seek(0, os.SEEK_END)
+            self.len = fileobj.tell() - self.start
+            fileobj.seek(self.start)
+        except (AttributeError, IOError, OSError, ValueError):
+            self.start = None
+            self.len = None
+        self.bytes_read = 0
+
+    @property
+    def seekable(self):
+        return self.start is not None
+
+    def rewind(self):
+        """ Go back to the start of the body so that it can be sent again """
+        if self.bytes_read == 0:
+            return
+        if not self.seekable:
+            raise UserWarning("the upload can't be resent, it isn't seekable")
+        self.fileobj.seek(self.start)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.fileobj.read(size)
+        if chunk:
+            self.bytes_read += len(chunk)
+            if self.progress is not None:
+                self.progress(self.bytes_read, self.len)
+        return chunk
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class MediaUpload(object):
+    """
+    Opens the file of a media upload (a path or a binary file object) and
+    provides its request headers. Files opened here are closed by close().
+    """
+
+    default_mime_type = 'application/octet-stream'
+
+    def __init__(
+        self, source, filename=None, mime_type=None, use_mmap=False
+    ):
+        self.owned = []
+        if hasattr(source, 'read'):
+            fileobj = source
+            filename = filename or os.path.basename(
+                getattr(source, 'name', '') or '')
+        else:
+            fileobj = open(source, 'rb')
+            self.owned.append(fileobj)
+            filename = filename or os.path.basename(source)
+        if not filename:
+            raise UserWarning("filename is required to upload a file object")
+        if use_mmap:
+            fileobj = self.map_file(fileobj)
+        self.fileobj = fileobj
+        self.filename = filename
+        self.mime_type = (
+            mime_type
+            or mimetypes.guess_type(filename)[0]
+            or self.default_mime_type
+        )
+
+    def map_file(self, fileobj):
+        """
+        Memory-map a file so that its pages are shared through the OS page
+        cache instead of being copied into each reader. Files that can't be
+        mapped (empty or not on disk) are read normally.
+        """
+        try:
+            mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, IOError, OSError, ValueError):
+            return fileobj
+        self.owned.append(mapped)
+        return mapped
+
+    @classmethod
+    def get_digest(cls, source, chunk_size=64 * 1024):
+        """ sha256 hex digest of a file, read in chunks """
+        digest = hashlib.sha256()
+        with open(source, 'rb') as fileobj:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_headers(self):
+        try:
+            self.filename.encode('ascii')
+            disposition = 'attachment; filename="%s"' % (
+                self.filename.replace('\\', '\\\\').replace('"', '\\"'))
+        except UnicodeError:
+            disposition = "attachment; filename*=UTF-8''%s" % quote(
+                self.filename.encode('utf-8'))
+        return {
+            'Content-Type': self.mime_type,
+            'Content-Disposition': disposition,
+        }
+
+    def get_reader(self, progress=None, chunk_size=64 * 1024):
+        return UploadReader(self.fileobj, progress, chunk_size)
+
+    def close(self):
+        for owned in reversed(self.owned):
+            owned.close()
+        self.owned = []
+
+
+class UploadIndex(object):
+    """
+    Maps the sha256 digests of uploaded files to their attachment ids, so
+    that files which were already uploaded are not uploaded again.
+
+    With a path, the index is kept in a file of JSON lines which is appended
+    to after every upload, otherwise it only lives in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path) if path else None
+        self.lock = threading.Lock()
+        self.media_ids = {}
+        if self.path and os.path.exists(self.path):
+            with io.open(self.path, encoding='utf-8') as index_file:
+                for line in index_file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.media_ids[entry['sha256']] = entry['id']
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Create an index from the `index` argument of upload_media_many, which
+        can be an UploadIndex, the path of an index file or None.
+        """
+        if isinstance(value, cls):
+            return value
+        return cls(value)
+
+    def get(self, digest):
+        with self.lock:
+            return self.media_ids.get(digest)
+
+    def set(self, digest, media_id):
+        line = json.dumps({'sha256': digest, 'id': media_id})
+        with self.lock:
+            self.media_ids[digest] = media_id
+            if self.path:
+                with io.open(self.path, 'a', encoding='utf-8') as index_file:
+                    index_file.write(u'%s\n' % line)